@@ -2,9 +2,14 @@ from fastapi import FastAPI
 from pydantic import BaseModel
 from sqladmin import Admin, ModelView
 from sqladmin.authentication import AuthenticationBackend
-from sqlalchemy.ext.asyncio import AsyncEngine
+from sqladmin.pagination import Pagination
+from sqlalchemy import BigInteger, Select, cast, func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql import column, table
 from starlette.requests import Request
 
+from core.cache import MISSING, LocalCache
 from model import (
     AIAssessment,
     Answer,
@@ -14,12 +19,138 @@ from model import (
     User,
     UserQuestion,
 )
+from repository.base import FilterCondition
 
 
 class UpdateUserPassword(BaseModel):
     password: str
 
 
+class LargeTableModelView(ModelView):
+    """
+    Список для больших таблиц. Если по статистике планировщика (pg_class.reltuples)
+    в таблице не меньше count_estimate_threshold строк, вместо COUNT(*) выводится
+    эта оценка. Страницы начиная с keyset_page_threshold при сортировке по
+    created_at выбираются условием (created_at, id) <= ключ вместо OFFSET: ключ
+    начала страницы берётся из последней строки предыдущей страницы, если она
+    недавно открывалась, иначе одним запросом по индексу (created_at, id).
+    """
+
+    count_estimate_threshold = 100_000
+    keyset_page_threshold = 10
+    # сколько ключей границ страниц и сколько секунд их помнить
+    page_keys_size = 1000
+    page_keys_ttl = 60
+
+    column_default_sort = [("created_at", True)]
+
+    pg_class = table("pg_class", column("oid"), column("reltuples"))
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._page_keys = LocalCache(self.page_keys_size, self.page_keys_ttl)
+
+    async def estimate_count(self) -> int:
+        """Оценка числа строк из статистики; -1, если таблицу ещё не анализировали."""
+        stmt = select(cast(self.pg_class.c.reltuples, BigInteger)).where(
+            self.pg_class.c.oid == func.to_regclass(f'"{self.model.__tablename__}"')
+        )
+        rows = await self._run_query(stmt)
+        return rows[0] if rows else -1
+
+    async def count(self, request: Request, stmt: Select | None = None) -> int:
+        if stmt is None:
+            estimate = await self.estimate_count()
+            if estimate >= self.count_estimate_threshold:
+                return estimate
+        return await super().count(request, stmt)
+
+    def _get_keyset_order(self, request: Request) -> bool | None:
+        """True/False - сортировка по created_at по убыванию/возрастанию, иначе None."""
+        sort_by = request.query_params.get("sortBy")
+        if sort_by is None:
+            return True
+        if sort_by == "created_at":
+            return request.query_params.get("sort", "asc") == "desc"
+        return None
+
+    def sort_query(self, stmt: Select, request: Request) -> Select:
+        stmt = super().sort_query(stmt, request)
+        # id разводит строки с одинаковым created_at, иначе страницы OFFSET
+        # и seek могли бы пересекаться
+        descending = self._get_keyset_order(request)
+        if descending is not None:
+            stmt = stmt.order_by(self.model.id.desc() if descending else self.model.id)
+        return stmt
+
+    async def _get_page_key(
+        self, offset: int, descending: bool
+    ) -> tuple[tuple, bool] | None:
+        """Ключ границы страницы и признак, что строка с ним на страницу не входит."""
+        key = self._page_keys.get((offset, descending))
+        if key is not MISSING:
+            return key, True
+        created_at, pk = self.model.created_at, self.model.id
+        stmt = (
+            select(pk)
+            .order_by(
+                *((created_at.desc(), pk.desc()) if descending else (created_at, pk))
+            )
+            .offset(offset)
+            .limit(1)
+        )
+        rows = await self._run_query(stmt)
+        if not rows:
+            return None
+        # created_at граничной строки подставляется подзапросом по первичному ключу
+        boundary = select(created_at).where(pk == rows[0]).scalar_subquery()
+        return (boundary, rows[0]), False
+
+    async def list(self, request: Request) -> Pagination:
+        page = self.validate_page_number(request.query_params.get("page"), 1)
+        descending = self._get_keyset_order(request)
+        if (
+            page < self.keyset_page_threshold
+            or descending is None
+            or request.query_params.get("search")
+        ):
+            pagination = await super().list(request)
+        else:
+            page_size = self.validate_page_number(
+                request.query_params.get("pageSize"), 0
+            )
+            page_size = min(page_size or self.page_size, max(self.page_size_options))
+            offset = (page - 1) * page_size
+            stmt = self.sort_query(self.list_query(request), request)
+            for relation in self._list_relations:
+                stmt = stmt.options(selectinload(relation))
+            rows = []
+            if (boundary := await self._get_page_key(offset, descending)) is not None:
+                key, exclusive = boundary
+                keyset, key = tuple_(self.model.created_at, self.model.id), tuple_(*key)
+                if descending:
+                    condition = keyset < key if exclusive else keyset <= key
+                else:
+                    condition = keyset > key if exclusive else keyset >= key
+                rows = await self._run_query(stmt.where(condition).limit(page_size))
+            pagination = Pagination(
+                rows=rows,
+                page=page,
+                page_size=page_size,
+                count=await self.count(request),
+            )
+        if (
+            descending is not None
+            and pagination.rows
+            and not request.query_params.get("search")
+        ):
+            # ключ начала следующей страницы: её откроют, скорее всего, следующей
+            last = pagination.rows[-1]
+            next_offset = pagination.page * pagination.page_size
+            self._page_keys.set((next_offset, descending), (last.created_at, last.id))
+        return pagination
+
+
 class UserAdmin(ModelView, model=User):
     page_size = 50
     page_size_options = [25, 50, 100, 200]
@@ -87,7 +218,52 @@ class TechnologyAdmin(ModelView, model=Technology):
     icon = "fa-solid fa-layer-group"
 
 
-class QuestionAdmin(ModelView, model=Question):
+class TextSearchMixin:
+    """
+    Поиск в списке по column_searchable_list: полнотекстовый (tsvector), нечеткий
+    по триграммам (pg_trgm, находит слова с опечатками) и по подстроке. Все три
+    условия обслуживаются GIN-индексами колонки. Если сортировка не выбрана,
+    результаты поиска идут по убыванию релевантности.
+    """
+
+    def _get_search_columns(self, stmt: Select) -> tuple[Select, list]:
+        columns = []
+        for field in self._search_fields:
+            model = self.model
+            parts = field.split(".")
+            for part in parts[:-1]:
+                model = getattr(model, part).mapper.class_
+                stmt = stmt.join(model)
+            columns.append(getattr(model, parts[-1]))
+        return stmt, columns
+
+    def search_query(self, stmt: Select, term: str) -> Select:
+        stmt, columns = self._get_search_columns(stmt)
+        expressions = []
+        for field in columns:
+            expressions.extend(
+                FilterCondition.get_by_expr(expr)(field, term)
+                for expr in (FilterCondition.SEARCH, FilterCondition.SIMILAR)
+            )
+            expressions.append(field.ilike(f"%{term}%"))
+        return stmt.filter(or_(*expressions))
+
+    def sort_query(self, stmt: Select, request: Request) -> Select:
+        term = request.query_params.get("search")
+        if term and not request.query_params.get("sortBy"):
+            # колонки поиска уже присоединены в search_query
+            _, columns = self._get_search_columns(select(self.model))
+            for expr in (FilterCondition.SEARCH, FilterCondition.SIMILAR):
+                rank = FilterCondition.get_rank_by_expr(expr)
+                ranks = [rank(field, term) for field in columns]
+                if len(ranks) > 1:
+                    stmt = stmt.order_by(func.greatest(*ranks).desc())
+                elif ranks:
+                    stmt = stmt.order_by(ranks[0].desc())
+        return super().sort_query(stmt, request)
+
+
+class QuestionAdmin(TextSearchMixin, ModelView, model=Question):
     page_size = 50
     page_size_options = [25, 50, 100, 200]
     column_list = [
@@ -130,7 +306,7 @@ class QuestionTechnologyAdmin(ModelView, model=QuestionTechnology):
     icon = "fa-solid fa-link"
 
 
-class UserQuestionAdmin(ModelView, model=UserQuestion):
+class UserQuestionAdmin(LargeTableModelView, model=UserQuestion):
     page_size = 50
     page_size_options = [25, 50, 100, 200]
     column_list = [
@@ -153,7 +329,7 @@ class UserQuestionAdmin(ModelView, model=UserQuestion):
     icon = "fa-solid fa-link"
 
 
-class AnswerAdmin(ModelView, model=Answer):
+class AnswerAdmin(TextSearchMixin, LargeTableModelView, model=Answer):
     page_size = 50
     page_size_options = [25, 50, 100, 200]
     column_list = [
@@ -175,7 +351,7 @@ class AnswerAdmin(ModelView, model=Answer):
     icon = "fa-solid fa-lightbulb"
 
 
-class AIAssessmentAdmin(ModelView, model=AIAssessment):
+class AIAssessmentAdmin(TextSearchMixin, LargeTableModelView, model=AIAssessment):
     page_size = 50
     page_size_options = [25, 50, 100, 200]
     column_list = [
@@ -202,10 +378,13 @@ def init_admin(
     engine: AsyncEngine,
     title: str,
     authentication_backend: AuthenticationBackend,
+    session_maker: async_sessionmaker[AsyncSession] | None = None,
 ):
+    # с session_maker чтения админки идут через RoutingSession на реплики
     admin = Admin(
         app=app,
-        engine=engine,
+        engine=engine if session_maker is None else None,
+        session_maker=session_maker,
         title=title,
         authentication_backend=authentication_backend,
     )
@@ -3,17 +3,80 @@
 # # from model.user import UserRole
 # from apps.v1.user.service import UserService
 # from core.database import db_conn
+import time
 
+from uuid import uuid4
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
 from sqladmin.authentication import AuthenticationBackend
 from starlette.requests import Request
 
-from core.cache import cache
+from core.cache import Cache, cache
 from core.config import config
 
 
+class RevocationList:
+    """
+    Отозванные сессии админки: множество в Redis с истечением элементов и его
+    копия в памяти процесса, которая перечитывается раз в refresh секунд.
+    Пока Redis недоступен, используется последняя прочитанная копия.
+    """
+
+    def __init__(self, cache: Cache, key: str, refresh: float) -> None:
+        self.cache = cache
+        self.key = key
+        self.refresh = refresh
+        self.loaded_at: float | None = None
+        self._revoked: set[str] = set()
+
+    async def is_revoked(self, session_id: str) -> bool:
+        if self.loaded_at is None or time.monotonic() - self.loaded_at >= self.refresh:
+            # отмечаем сразу, чтобы конкурентные запросы не перечитывали список
+            self.loaded_at = time.monotonic()
+            if (revoked := await self.cache.get_unexpired(self.key)) is not None:
+                self._revoked = set(revoked)
+        return session_id in self._revoked
+
+    async def revoke(self, session_id: str, ttl: int) -> None:
+        self._revoked.add(session_id)
+        await self.cache.add_expiring(self.key, session_id, time.time() + ttl)
+
+
 class AdminAuth(AuthenticationBackend):
-    def __init__(self, secret_key: str) -> None:
+    """
+    Вход в админку по одноразовой ссылке с токеном из Redis. После проверки
+    токена в сессию кладётся подписанный secret_key идентификатор сессии со
+    сроком session_ttl: пока он действителен, запросы проверяются локально, без
+    обращения к Redis. Когда срок истёк, токен из сессии проверяется в Redis
+    заново; выход из админки отзывает идентификатор сессии и удаляет токен.
+    """
+
+    SESSION_KEY = "admin_session"
+    REVOKED_KEY = "admin:revoked_sessions"
+
+    def __init__(
+        self,
+        secret_key: str,
+        session_ttl: int = config.auth.admin_session_ttl,
+        revocation_refresh: int = config.auth.admin_revocation_refresh,
+    ) -> None:
         super().__init__(secret_key)
+        self.serializer = URLSafeTimedSerializer(secret_key, salt="admin-session")
+        self.session_ttl = session_ttl
+        self.revocations = RevocationList(cache, self.REVOKED_KEY, revocation_refresh)
+
+    def _issue_session(self, request: Request, token: str) -> None:
+        request.session[self.SESSION_KEY] = self.serializer.dumps(uuid4().hex)
+        request.session["token"] = token
+
+    def _get_session_id(self, request: Request) -> str | None:
+        signed = request.session.get(self.SESSION_KEY)
+        if not signed:
+            return None
+        try:
+            return self.serializer.loads(signed, max_age=self.session_ttl)
+        except BadSignature:
+            return None
 
     async def login(self, request: Request) -> bool:
         return False
@@ -22,16 +85,24 @@ class AdminAuth(AuthenticationBackend):
         if not request.session.get("token"):
             return False
 
+        # после выхода ни подписанная сессия, ни токен из неё не должны работать
+        if session_id := self._get_session_id(request):
+            await self.revocations.revoke(session_id, self.session_ttl)
+        await cache.delete(request.session["token"])
+        request.session.pop(self.SESSION_KEY, None)
         del request.session["token"]  # TODO удаляются все куки решить!
         return True
 
     async def authenticate(self, request: Request) -> bool:
+        if session_id := self._get_session_id(request):
+            return not await self.revocations.is_revoked(session_id)
         token = request.session.get("token")
         if token and await cache.get(token):
+            self._issue_session(request, token)
             return True
         token = request.query_params.get("token")
         if token and await cache.get(token):
-            request.session["token"] = token
+            self._issue_session(request, token)
             return True
         return False
 
@@ -0,0 +1,68 @@
+"""
+Сравнение поштучных get/set/delete кэша с get_many/set_many/delete_many на
+10 000 ключей. Нужен Redis из config.redis; ключи пишутся с префиксом bench:
+и удаляются в конце.
+
+    python -m benchmark.cache --keys 10000
+"""
+
+import argparse
+import asyncio
+import time
+
+from core.cache import Cache
+
+
+async def timed(label: str, coroutine) -> float:
+    started = time.perf_counter()
+    await coroutine
+    elapsed = time.perf_counter() - started
+    print(f"{label:>14}: {elapsed * 1000:9.1f} ms")
+    return elapsed
+
+
+async def loop_set(cache: Cache, items: dict[str, str]) -> None:
+    for key, value in items.items():
+        await cache.set(key, value)
+
+
+async def loop_get(cache: Cache, keys: list[str]) -> None:
+    for key in keys:
+        await cache.get(key)
+
+
+async def loop_delete(cache: Cache, keys: list[str]) -> None:
+    for key in keys:
+        await cache.delete(key)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    cache = Cache(local_size=0)
+    if args.batch_size:
+        cache.batch_size = args.batch_size
+    items = {f"bench:{i}": f"value:{i}" for i in range(args.keys)}
+    keys = list(items)
+
+    print(f"{args.keys} keys, batch size {cache.batch_size}")
+    results = {}
+    for operation, single, batch in (
+        ("set", loop_set(cache, items), cache.set_many(items)),
+        ("get", loop_get(cache, keys), cache.get_many(keys)),
+        ("delete", loop_delete(cache, keys), cache.delete_many(keys)),
+    ):
+        looped = await timed(f"{operation} loop", single)
+        if operation == "delete":
+            await cache.set_many(items)
+        batched = await timed(f"{operation}_many", batch)
+        results[operation] = looped / batched
+    print(", ".join(f"{op}: x{speedup:.1f}" for op, speedup in results.items()))
+    await cache.redis_cache.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+"""
+Время кодирования/декодирования и размер значения для каждого установленного
+кодека кэша, со сжатием и без. База и Redis не нужны: значения - словари в
+форме Base.to_dict для пользователя и ответа с длинным текстом.
+
+    python -m benchmark.codec --iterations 20000
+"""
+
+import argparse
+import json
+import time
+
+from datetime import datetime, timedelta
+
+from core.codec import CODECS, Serializer
+
+
+def sample_values(text_size: int) -> dict[str, dict]:
+    now = datetime.now().astimezone()
+    user = {
+        "id": 123456,
+        "tg_id": 987654321,
+        "tg_url": "https://t.me/example",
+        "first_name": "Иван",
+        "last_name": "Петров",
+        "tg_username": "ivan_petrov",
+        "coins": 42,
+        "is_active": True,
+        "is_admin": False,
+        "subscription": now + timedelta(days=30),
+        "password": "$2b$12$" + "x" * 53,
+        "created_at": now,
+        "updated_at": now,
+    }
+    sentence = "Генератор возвращает итератор и вычисляет значения лениво. "
+    answer = {
+        "id": 654321,
+        "text": (sentence * (text_size // len(sentence) + 1))[:text_size],
+        "user_id": 123456,
+        "question_id": 777,
+        "created_at": now,
+        "updated_at": now,
+    }
+    return {"user": user, "answer": answer}
+
+
+def bench(serializer: Serializer, value: dict, iterations: int) -> tuple:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        data = serializer.dumps(value)
+    encoded = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(iterations):
+        serializer.loads(data)
+    decoded = time.perf_counter() - started
+    scale = 1_000_000 / iterations
+    return encoded * scale, decoded * scale, len(data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--text-size", type=int, default=8_000)
+    parser.add_argument("--threshold", type=int, default=1024)
+    args = parser.parse_args()
+
+    values = sample_values(args.text_size)
+    baseline = {
+        name: len(json.dumps(value, default=str).encode())
+        for name, value in values.items()
+    }
+    print(f"plain json.dumps size: {baseline}")
+    print(f"{'value':>6} {'codec':>8} {'zlib':>5} {'enc us':>8} {'dec us':>8} bytes")
+    for name, value in values.items():
+        for codec, available in CODECS.items():
+            if available is None:
+                print(f"{name:>6} {codec:>8}  not installed")
+                continue
+            for threshold in (0, args.threshold):
+                serializer = Serializer(codec, compress_threshold=threshold)
+                encode, decode, size = bench(serializer, value, args.iterations)
+                print(
+                    f"{name:>6} {codec:>8} {'yes' if threshold else 'no':>5} "
+                    f"{encode:8.2f} {decode:8.2f} {size}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Нагрузочная проверка атомарного списания монет: N параллельных debit по одному
+пользователю с балансом B должны дать ровно min(N, B) успешных списаний
+и итоговый баланс B - min(N, B), без потерянных обновлений.
+
+    python -m benchmark.seed
+    python -m benchmark.coins --callers 200 --balance 150
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmark.seed import get_engine, get_session_factory
+from repository.user import UserRepository
+from service.user import UserService
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--callers", type=int, default=200)
+    parser.add_argument("--balance", type=int, default=150)
+    parser.add_argument("--user-id", type=int, default=1)
+    args = parser.parse_args()
+
+    engine = get_engine()
+    session_factory = get_session_factory(engine)
+    async with session_factory() as session:
+        user = await UserRepository(session=session).get(id=args.user_id)
+        await UserRepository(session=session).update(user, coins=args.balance)
+
+    async def debit() -> int | None:
+        async with session_factory() as session:
+            return await UserService(session=session).debit(args.user_id)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[debit() for _ in range(args.callers)])
+    elapsed = time.perf_counter() - started
+
+    async with session_factory() as session:
+        user = await UserRepository(session=session).get(id=args.user_id)
+    succeeded = sum(result is not None for result in results)
+    expected = min(args.callers, args.balance)
+    ok = succeeded == expected and user.coins == args.balance - expected
+    print(
+        f"callers={args.callers} succeeded={succeeded} balance={user.coins} "
+        f"time={elapsed * 1000:.1f}ms {'OK' if ok else 'FAIL'}"
+    )
+    await engine.dispose()
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
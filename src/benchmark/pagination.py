@@ -0,0 +1,69 @@
+"""
+Сравнение offset- и keyset-пагинации по таблице answer на разной глубине.
+
+    python -m benchmark.seed --answers 1000000
+    python -m benchmark.pagination --page-size 50 --repeat 5
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmark.seed import get_engine, get_session_factory
+from model.answer import Answer
+from repository.answer import AnswerRepository
+from repository.base import Cursor
+
+
+DEPTHS = [0, 1_000, 10_000, 100_000, 500_000, 900_000]
+
+
+async def timeit(coroutine_factory, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coroutine_factory()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = get_engine()
+    session_factory = get_session_factory(engine)
+    print(f"{'offset':>10} | {'OFFSET, ms':>12} | {'keyset, ms':>12}")
+    async with session_factory() as session:
+        repository = AnswerRepository(session=session)
+        total = await repository.count()
+        for depth in [depth for depth in DEPTHS if depth < total]:
+            # курсор строки, предшествующей странице, строится вне замера
+            cursor = None
+            if depth:
+                (anchor,) = await repository.filter(limit=1, offset=depth - 1)
+                cursor = Cursor.encode(Cursor.NEXT, [anchor.created_at, anchor.id])
+            offset_ms = await timeit(
+                lambda depth=depth: repository.filter(
+                    order_by=[Answer.created_at, Answer.id],
+                    limit=args.page_size,
+                    offset=depth,
+                ),
+                args.repeat,
+            )
+            keyset_ms = await timeit(
+                lambda cursor=cursor: repository.paginate(
+                    limit=args.page_size, cursor=cursor
+                ),
+                args.repeat,
+            )
+            session.expunge_all()
+            print(f"{depth:>10} | {offset_ms:>12.2f} | {keyset_ms:>12.2f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
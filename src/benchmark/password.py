@@ -0,0 +1,70 @@
+"""
+Задержка event loop при хэшировании паролей bcrypt прямо в корутине и в пуле
+потоков PasswordHasher. Пока идут хэши, фоновая корутина просыпается каждые
+interval мс; задержка - насколько позже она проснулась. База не нужна.
+
+    python -m benchmark.password --hashes 32
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from core.config import config
+from core.password import PasswordHasher
+
+
+async def monitor_lag(interval: float, lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def hash_inline(count: int) -> None:
+    async def one(i: int) -> None:
+        config.auth.pwd_context.hash(f"password-{i}")
+
+    await asyncio.gather(*(one(i) for i in range(count)))
+
+
+async def hash_offloaded(hasher: PasswordHasher, count: int) -> None:
+    await asyncio.gather(*(hasher.hash(f"password-{i}") for i in range(count)))
+
+
+async def measure(label: str, coroutine, interval: float) -> None:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_lag(interval, lags, stop))
+    await asyncio.sleep(interval)
+    started = time.perf_counter()
+    await coroutine
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    print(
+        f"{label:>10}: total {elapsed:6.2f} s, loop lag "
+        f"median {statistics.median(lags) * 1000:7.1f} ms, "
+        f"p99 {p99 * 1000:7.1f} ms, max {lags[-1] * 1000:7.1f} ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hashes", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=config.auth.hash_workers)
+    parser.add_argument("--interval", type=float, default=0.005)
+    args = parser.parse_args()
+
+    hasher = PasswordHasher(config.auth.pwd_context, args.workers)
+    await measure("inline", hash_inline(args.hashes), args.interval)
+    await measure("offloaded", hash_offloaded(hasher, args.hashes), args.interval)
+    print(f"hasher: {hasher.stats()}")
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
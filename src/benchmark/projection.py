@@ -0,0 +1,61 @@
+"""
+Время и пиковая память чтения 100k ответов: ORM-объекты (filter) против
+проекции колонок (project) в Row и в dataclass со __slots__.
+
+    python -m benchmark.seed
+    python -m benchmark.projection --rows 100000
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import time
+import tracemalloc
+
+from benchmark.seed import get_engine, get_session_factory
+from model.answer import Answer
+from repository.answer import AnswerRepository
+
+
+@dataclasses.dataclass(slots=True)
+class AnswerScore:
+    id: int
+    question_id: int
+    score: int
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    modes = {
+        "orm": lambda repository: repository.filter(limit=args.rows),
+        "rows": lambda repository: repository.project(
+            [Answer.id, Answer.question_id, Answer.score], limit=args.rows
+        ),
+        "dataclass": lambda repository: repository.project(
+            AnswerScore, limit=args.rows
+        ),
+    }
+    engine = get_engine()
+    session_factory = get_session_factory(engine)
+    print(f"{'mode':>10} | {'rows':>8} | {'time, ms':>9} | {'peak, MiB':>10}")
+    for mode, query in modes.items():
+        async with session_factory() as session:
+            repository = AnswerRepository(session=session)
+            tracemalloc.start()
+            started = time.perf_counter()
+            rows = await query(repository)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        print(
+            f"{mode:>10} | {len(rows):>8} | {elapsed * 1000:>9.1f} | "
+            f"{peak / 1024 / 1024:>10.1f}"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
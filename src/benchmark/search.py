@@ -0,0 +1,86 @@
+"""
+Сравнение поиска по answer.text: ILIKE '%...%', полнотекстовый search
+и триграммный similar, с планом каждого запроса.
+
+    python -m benchmark.seed --answers 1000000
+    python -m benchmark.search --limit 50 --repeat 5
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+
+from benchmark.seed import get_engine, get_session_factory
+from repository.answer import AnswerRepository
+from repository.base import FilterCondition
+
+
+QUERIES = ["транзакция", "блокировка индекс", "транзакцыя", "postgre"]
+
+
+async def timeit(coroutine_factory, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coroutine_factory()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--explain", action="store_true", help="вывести план каждого запроса"
+    )
+    args = parser.parse_args()
+
+    engine = get_engine()
+    session_factory = get_session_factory(engine)
+    async with session_factory() as session:
+        repository = AnswerRepository(session=session)
+        # порог word_similarity по умолчанию 0.6 рассчитан на короткие строки
+        await session.execute(text("SET pg_trgm.word_similarity_threshold = 0.5"))
+        print(
+            f"{'query':>20} | {'method':>8} | {'rows':>5} | {'ms':>10} | {'index':>5}"
+        )
+        for query in QUERIES:
+            methods = {
+                "ilike": lambda query=query: repository.filter(
+                    order_by=[], limit=args.limit, text={FilterCondition.ILIKE: query}
+                ),
+                "search": lambda query=query: repository.search(
+                    "text", query, limit=args.limit
+                ),
+                "similar": lambda query=query: repository.search(
+                    "text", query, FilterCondition.SIMILAR, limit=args.limit
+                ),
+            }
+            for method, call in methods.items():
+                rows = await call()
+                ms = await timeit(call, args.repeat)
+                expr = FilterCondition.ILIKE if method == "ilike" else method
+                statement, params = repository._get_statement(
+                    order_by=[], limit=args.limit, text={expr: query}
+                )
+                compiled = statement.params(params).compile(
+                    dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+                )
+                plan = list(await session.scalars(text(f"EXPLAIN {compiled}")))
+                uses_index = any("Bitmap Index Scan" in line for line in plan)
+                session.expunge_all()
+                print(
+                    f"{query:>20} | {method:>8} | {len(rows):>5} | {ms:>10.2f} | "
+                    f"{'yes' if uses_index else 'no':>5}"
+                )
+                if args.explain:
+                    print("\n".join(plan))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
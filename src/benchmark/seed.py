@@ -0,0 +1,218 @@
+"""
+Генератор данных для бенчмарков.
+
+Данные создаются в отдельной базе (config.db.name + "_bench") на стороне Postgres
+через generate_series, поэтому миллионы строк вставляются за секунды.
+
+    python -m benchmark.seed --users 10000 --questions 5000 --answers 1000000
+"""
+
+import argparse
+import asyncio
+
+from typing import NamedTuple
+
+from sqlalchemy import ARRAY, Float, Integer, Text, bindparam, select, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from core.config import config
+from model.answer import Answer
+from model.base import Base
+from model.user import User
+from repository.base import BaseRepository
+
+
+BENCH_DB_NAME = f"{config.db.name}_bench"
+
+# словарь для текстов ответов: полнотекстовому и триграммному поиску нужны
+# настоящие слова, а не md5
+VOCABULARY = (
+    "индекс транзакция запрос таблица база данных сервер клиент кэш очередь "
+    "поток процесс память список словарь кортеж множество функция класс объект "
+    "метод декоратор генератор итератор исключение модуль пакет тест миграция "
+    "сессия соединение блокировка репликация шардирование python postgres redis "
+    "docker fastapi sqlalchemy asyncio django api http json"
+).split()
+WORDS_PER_ANSWER = 12
+
+
+def get_engine() -> AsyncEngine:
+    return create_async_engine(url=config.db.url(BENCH_DB_NAME))
+
+
+def get_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(bind=engine, expire_on_commit=False)
+
+
+class Sample(NamedTuple):
+    """id существующих записей заполненной базы для вызовов репозиториев."""
+
+    user_id: int
+    tg_id: int
+    question_id: int
+    answer_id: int
+
+
+async def get_sample(session: AsyncSession) -> Sample:
+    user_id, tg_id = (await session.execute(select(User.id, User.tg_id).limit(1))).one()
+    question_id, answer_id = (
+        await session.execute(
+            select(Answer.question_id, Answer.id).where(Answer.user_id == user_id)
+        )
+    ).first()
+    return Sample(user_id, tg_id, question_id, answer_id)
+
+
+def repository(cls: type[BaseRepository], session: AsyncSession) -> BaseRepository:
+    instance = cls(session=session)
+    # запросы должны дойти до Postgres, а не закончиться в кэше Redis
+    instance.cache_ttl = None
+    return instance
+
+
+async def create_database() -> None:
+    engine = create_async_engine(url=config.db.url(), isolation_level="AUTOCOMMIT")
+    async with engine.connect() as connection:
+        exists = await connection.scalar(
+            text("SELECT 1 FROM pg_database WHERE datname = :name"),
+            {"name": BENCH_DB_NAME},
+        )
+        if not exists:
+            await connection.execute(text(f'CREATE DATABASE "{BENCH_DB_NAME}"'))
+    await engine.dispose()
+
+
+async def seed(
+    engine: AsyncEngine,
+    users: int = 10_000,
+    questions: int = 5_000,
+    technologies: int = 20,
+    answers: int = 1_000_000,
+    skew: float = 2.0,
+    assessed: float = 1.0,
+    seed: float = 0.5,
+) -> None:
+    """Пересоздаёт схему и заполняет таблицы. У вопроса от одной до трёх
+    технологий. Активность пользователей неравномерна: id пользователя выданного
+    вопроса - users * random() ^ skew, поэтому при skew > 1 у пользователей
+    с малыми id ответов больше всего (skew = 1 - равномерно). На каждый выданный
+    вопрос есть ответ, оценку модели получает доля assessed ответов. random()
+    инициализируется seed, так что одинаковые параметры дают одинаковые данные."""
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+        statements = [
+            "SELECT setseed(:seed)",
+            """
+            INSERT INTO "user" (tg_id, tg_url, first_name, last_name, tg_username,
+                coins, is_active, is_admin, created_at, updated_at)
+            SELECT 100000 + i, 'https://t.me/user' || i, 'Name' || i, 'Surname' || i,
+                'user' || i, (random() * 100)::int, true, false,
+                now() - (i || ' minutes')::interval, now()
+            FROM generate_series(1, :users) AS i
+            """,
+            """
+            INSERT INTO technology (name, created_at, updated_at)
+            SELECT 'Technology ' || i, now(), now()
+            FROM generate_series(1, :technologies) AS i
+            """,
+            """
+            INSERT INTO question (text, complexity, published, created_at, updated_at)
+            SELECT 'Question ' || i || ' ' || md5(i::text), 1 + i % 9, i % 10 <> 0,
+                now() - (i || ' minutes')::interval, now()
+            FROM generate_series(1, :questions) AS i
+            """,
+            """
+            INSERT INTO question_technology (question_id, technology_id,
+                created_at, updated_at)
+            SELECT i, 1 + (i + k * 7) % :technologies, now(), now()
+            FROM generate_series(1, :questions) AS i, generate_series(0, i % 3) AS k
+            ON CONFLICT DO NOTHING
+            """,
+            """
+            INSERT INTO user_question (user_id, question_id, created_at, updated_at)
+            SELECT 1 + floor(:users * power(random(), :skew))::int,
+                1 + i % :questions, now() - (i || ' seconds')::interval, now()
+            FROM generate_series(1, :answers) AS i
+            """,
+            """
+            INSERT INTO answer (text, user_id, question_id, score,
+                created_at, updated_at)
+            SELECT (
+                    SELECT string_agg(
+                        v.words[1 + abs(hashint4(uq.id::int * 100 + k))
+                            % cardinality(v.words)],
+                        ' '
+                    )
+                    FROM generate_series(1, :words_per_answer) AS k
+                ),
+                uq.user_id, uq.question_id, 1 + uq.id % 10, uq.created_at, now()
+            FROM user_question AS uq, (SELECT :words AS words) AS v
+            """,
+            """
+            INSERT INTO ai_assessment (text, user_id, question_id, answer_id,
+                created_at, updated_at)
+            SELECT 'Assessment ' || md5(a.id::text), a.user_id, a.question_id, a.id,
+                a.created_at, now()
+            FROM answer a
+            WHERE random() < :assessed
+            """,
+        ]
+        params = {
+            "users": users,
+            "questions": questions,
+            "technologies": technologies,
+            "answers": answers,
+            "words_per_answer": WORDS_PER_ANSWER,
+            "skew": skew,
+            "assessed": assessed,
+            "seed": seed,
+        }
+        for statement in statements:
+            bindparams = [
+                bindparam(key, type_=Float if isinstance(value, float) else Integer)
+                for key, value in params.items()
+                if f":{key}" in statement
+            ]
+            if ":words " in statement:
+                bindparams.append(
+                    bindparam("words", value=list(VOCABULARY), type_=ARRAY(Text))
+                )
+            statement = text(statement).bindparams(*bindparams)
+            await connection.execute(statement, params)
+        await connection.execute(text("ANALYZE"))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--questions", type=int, default=5_000)
+    parser.add_argument("--technologies", type=int, default=20)
+    parser.add_argument("--answers", type=int, default=1_000_000)
+    parser.add_argument("--skew", type=float, default=2.0)
+    parser.add_argument("--assessed", type=float, default=1.0)
+    parser.add_argument("--seed", type=float, default=0.5)
+    args = parser.parse_args()
+
+    await create_database()
+    engine = get_engine()
+    await seed(
+        engine,
+        users=args.users,
+        questions=args.questions,
+        technologies=args.technologies,
+        answers=args.answers,
+        skew=args.skew,
+        assessed=args.assessed,
+        seed=args.seed,
+    )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
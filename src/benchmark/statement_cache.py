@@ -0,0 +1,59 @@
+"""
+Микро-бенчмарк горячего пути find(id=...) с кэшем форм запросов и без него.
+
+Режим --build-only не требует базы: замеряется сборка Select и генерация
+ключа compiled cache SQLAlchemy, то есть то, что кэш форм экономит на вызов.
+
+    python -m benchmark.statement_cache --build-only
+    python -m benchmark.seed && python -m benchmark.statement_cache
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmark.seed import get_engine, get_session_factory
+from repository.base import statement_cache
+from repository.user import UserRepository
+
+
+def bench_build(repository: UserRepository, iterations: int) -> float:
+    started = time.perf_counter()
+    for i in range(iterations):
+        statement, _ = repository._get_statement(id=i)
+        statement._generate_cache_key()
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+async def bench_find(repository: UserRepository, iterations: int) -> float:
+    started = time.perf_counter()
+    for i in range(iterations):
+        await repository.find(id=i % 1000 + 1)
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=10_000)
+    parser.add_argument("--build-only", action="store_true")
+    args = parser.parse_args()
+
+    maxsize = statement_cache.maxsize
+    engine = None if args.build_only else get_engine()
+    for label, size in (("without cache", 0), ("with cache", maxsize)):
+        statement_cache.clear()
+        statement_cache.maxsize = size
+        if args.build_only:
+            elapsed = bench_build(UserRepository(session=None), args.iterations)
+        else:
+            async with get_session_factory(engine)() as session:
+                elapsed = await bench_find(
+                    UserRepository(session=session), args.iterations
+                )
+        print(f"{label:>14}: {elapsed:8.1f} us/call  {statement_cache.stats()}")
+    if engine is not None:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
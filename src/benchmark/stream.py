@@ -0,0 +1,53 @@
+"""
+Пиковое потребление памяти при полном проходе по answer: all() против stream().
+
+    python -m benchmark.seed --answers 1000000
+    python -m benchmark.stream --chunk-size 1000
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from benchmark.seed import get_engine, get_session_factory
+from repository.answer import AnswerRepository
+
+
+async def measure(session_factory, scan) -> tuple[int, float, float]:
+    async with session_factory() as session:
+        repository = AnswerRepository(session=session)
+        tracemalloc.start()
+        started = time.perf_counter()
+        rows = await scan(repository)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return rows, elapsed, peak / 1024 / 1024
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    async def scan_all(repository: AnswerRepository) -> int:
+        return len(await repository.all())
+
+    async def scan_stream(repository: AnswerRepository) -> int:
+        rows = 0
+        async for _ in repository.stream(chunk_size=args.chunk_size):
+            rows += 1
+        return rows
+
+    engine = get_engine()
+    session_factory = get_session_factory(engine)
+    print(f"{'mode':>8} | {'rows':>10} | {'time, s':>8} | {'peak, MiB':>10}")
+    for mode, scan in (("all", scan_all), ("stream", scan_stream)):
+        rows, elapsed, peak = await measure(session_factory, scan)
+        print(f"{mode:>8} | {rows:>10} | {elapsed:>8.2f} | {peak:>10.1f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,285 @@
+"""
+Набор микро-бенчмарков методов репозиториев и сценариев UserService на
+заполненной базе.
+
+Каждый бенчмарк выполняется в своей транзакции, которая откатывается в конце:
+commit внутри репозиториев и сервисов фиксирует только точку сохранения
+(join_transaction_mode="create_savepoint"), поэтому записи не накапливаются и
+повторные прогоны идут на одних и тех же данных. Кэш Redis у репозиториев
+отключён - замеряется работа с Postgres.
+
+Результаты (медиана, p95, операций в секунду) сравниваются с сохранённым
+baseline.json: если медиана выросла больше чем на --threshold, бенчмарк
+помечается REGRESSION и код выхода - 1.
+
+    python -m benchmark.seed --answers 1000000
+    python -m benchmark.suite --save-baseline
+    python -m benchmark.suite --output results.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import sqlalchemy
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from benchmark.seed import Sample, get_engine, get_sample, repository
+from repository.answer import AnswerRepository
+from repository.question_technology import QuestionTechnologyRepository
+from repository.user import UserRepository
+from repository.user_question import UserQuestionRepository
+from service.user import UserService
+
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+tg_ids = itertools.count(10**12)
+question_ids = itertools.cycle(range(1, 5001))
+
+
+class Benchmark(NamedTuple):
+    name: str
+    run: Callable[[AsyncSession, Sample], Awaitable[Any]]
+    # для дорогих сценариев (bcrypt) число повторов меньше общего
+    iterations: int | None = None
+
+
+def user_service(session: AsyncSession) -> UserService:
+    service = UserService(session)
+    service.repository.cache_ttl = None
+    return service
+
+
+def new_user() -> dict[str, Any]:
+    tg_id = next(tg_ids)
+    return {
+        "tg_id": tg_id,
+        "tg_url": f"https://t.me/bench{tg_id}",
+        "first_name": "Bench",
+    }
+
+
+async def create_and_verify(session: AsyncSession) -> None:
+    service = user_service(session)
+    user = await service.create(**new_user(), password="password")
+    await service.verify_password("password", user.password)
+
+
+BENCHMARKS = [
+    Benchmark(
+        "repository.filter",
+        lambda s, x: repository(AnswerRepository, s).filter(
+            user_id=x.user_id, limit=50
+        ),
+    ),
+    Benchmark(
+        "repository.get",
+        lambda s, x: repository(UserRepository, s).get(id=x.user_id),
+    ),
+    Benchmark(
+        "repository.count",
+        lambda s, x: repository(AnswerRepository, s).count(user_id=x.user_id),
+    ),
+    Benchmark(
+        "repository.exists",
+        lambda s, x: repository(UserQuestionRepository, s).exists(
+            user_id=x.user_id, question_id=x.question_id
+        ),
+    ),
+    Benchmark(
+        "repository.create",
+        lambda s, x: repository(UserQuestionRepository, s).create(
+            user_id=x.user_id, question_id=x.question_id
+        ),
+    ),
+    Benchmark(
+        "repository.get_or_create.found",
+        lambda s, x: repository(QuestionTechnologyRepository, s).get_or_create(
+            ["question_id", "technology_id"], question_id=1, technology_id=2
+        ),
+    ),
+    Benchmark(
+        "repository.get_or_create.created",
+        lambda s, x: repository(QuestionTechnologyRepository, s).get_or_create(
+            ["question_id", "technology_id"],
+            question_id=next(question_ids),
+            technology_id=1,
+        ),
+    ),
+    Benchmark(
+        "user_service.find_by_tg_id",
+        lambda s, x: user_service(s).find(tg_id=x.tg_id),
+    ),
+    Benchmark(
+        "user_service.debit",
+        lambda s, x: user_service(s).debit(x.user_id),
+    ),
+    Benchmark(
+        "user_service.credit",
+        lambda s, x: user_service(s).credit(x.user_id),
+    ),
+    Benchmark(
+        "user_service.debit_many",
+        lambda s, x: user_service(s).debit_many(
+            {user_id: 1 for user_id in range(x.user_id, x.user_id + 10)}
+        ),
+    ),
+    Benchmark(
+        "user_service.create",
+        lambda s, x: user_service(s).create(**new_user()),
+    ),
+    Benchmark(
+        "user_service.create_with_password",
+        lambda s, x: create_and_verify(s),
+        iterations=5,
+    ),
+]
+
+
+@contextlib.asynccontextmanager
+async def rollback_session(engine: AsyncEngine) -> AsyncIterator[AsyncSession]:
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(
+            bind=connection,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        try:
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
+
+
+async def measure(
+    engine: AsyncEngine, benchmark: Benchmark, iterations: int, warmup: int
+) -> dict[str, float]:
+    iterations = benchmark.iterations or iterations
+    timings = []
+    async with rollback_session(engine) as session:
+        sample = await get_sample(session)
+        for index in range(min(warmup, iterations) + iterations):
+            started = time.perf_counter()
+            await benchmark.run(session, sample)
+            elapsed = time.perf_counter() - started
+            session.expunge_all()
+            if index >= min(warmup, iterations):
+                timings.append(elapsed * 1000)
+    median = statistics.median(timings)
+    return {
+        "iterations": len(timings),
+        "median_ms": median,
+        "p95_ms": (
+            statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+        ),
+        "ops_per_second": 1000 / median if median else 0.0,
+    }
+
+
+async def get_table_rows(engine: AsyncEngine) -> dict[str, int]:
+    async with engine.connect() as connection:
+        rows = await connection.execute(
+            text(
+                "SELECT relname, reltuples::bigint FROM pg_class "
+                "WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+            )
+        )
+        return dict(rows.tuples().all())
+
+
+def same_volumes(before: dict[str, int], after: dict[str, int]) -> bool:
+    # reltuples - оценка, после autovacuum она немного плавает
+    return before.keys() == after.keys() and all(
+        abs(after[table] - rows) <= max(rows, 1) * 0.1 for table, rows in before.items()
+    )
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["median_ms"], result["median_ms"]
+        if after > before * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--only", help="запустить бенчмарки, имя которых содержит")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--output", type=Path, help="сохранить результаты в JSON")
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else None
+    engine = get_engine()
+    tables = await get_table_rows(engine)
+    if baseline and not same_volumes(baseline["meta"]["tables"], tables):
+        print("warning: data volumes differ from the baseline, re-seed the database")
+
+    results: dict[str, dict[str, float]] = {}
+    print(f"{'benchmark':<36} | {'median, ms':>10} | {'p95, ms':>10} | {'change':>8}")
+    for benchmark in BENCHMARKS:
+        if args.only and args.only not in benchmark.name:
+            continue
+        result = await measure(engine, benchmark, args.iterations, args.warmup)
+        results[benchmark.name] = result
+        change = ""
+        if baseline and benchmark.name in baseline["results"]:
+            before = baseline["results"][benchmark.name]["median_ms"]
+            change = f"{(result['median_ms'] / before - 1) * 100:+.1f}%"
+        print(
+            f"{benchmark.name:<36} | {result['median_ms']:>10.3f} | "
+            f"{result['p95_ms']:>10.3f} | {change:>8}"
+        )
+    await engine.dispose()
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "iterations": args.iterations,
+            "tables": tables,
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"baseline saved to {args.baseline}")
+    elif baseline:
+        regressions = compare(results, baseline["results"], args.threshold)
+        for name in regressions:
+            print(f"REGRESSION {name}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,66 +1,698 @@
+import asyncio
+import contextlib
+import functools
+import json
+import math
+import random
+import time
+
+from collections import OrderedDict, defaultdict
+from collections.abc import Awaitable, Callable, Iterable, Mapping, Sequence
+from typing import Any
+
 import redis.asyncio as redis
 
+from pydantic import BaseModel
 from redis import RedisError
 
+from core.codec import CodecError, Serializer
 from core.config import config
+from core.metrics import Gauge, registry
+
+
+MISSING = object()
+
+
+class LocalCache:
+    """
+    Кэш в памяти процесса: не больше maxsize ключей, каждый живёт ttl секунд,
+    при переполнении вытесняется давно не использованный (LRU).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Any:
+        """Значение ключа или MISSING, если его нет или срок истёк."""
+        item = self._data.get(key)
+        if item is None or item[0] < time.monotonic():
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return MISSING
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, key: str, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
 
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
 
-# from schema.user import UserModelSchema
+
+class CacheUnavailable(RedisError):
+    """Redis не ответил в отведённое время, вернул ошибку или отключён."""
+
+
+class CircuitBreaker:
+    """
+    Размыкается после threshold ошибок подряд: следующие reset_timeout секунд
+    вызовы не выполняются вовсе, затем один пробный вызов решает, замкнуться
+    снова или остаться разомкнутым ещё на reset_timeout.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != self.CLOSED
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if (
+            self.state == self.OPEN
+            and time.monotonic() - self.opened_at >= self.reset_timeout
+        ):
+            self.state = self.HALF_OPEN
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+            if self.state != self.OPEN:
+                self.opened += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
 
 
 class Cache:
+    """
+    Кэш в Redis с необязательным локальным кэшем процесса (L1) перед ним.
+    L1 используется только пока процесс подписан на канал инвалидации
+    (start_invalidation): любая запись или удаление ключа в любом воркере
+    публикует его имя, и остальные воркеры выбрасывают свою локальную копию.
+
+    Каждый вызов Redis ограничен timeout секундами и идёт через CircuitBreaker.
+    При ошибке чтения возвращают промах - вызывающий код идёт в источник, а ключи
+    несостоявшихся записей и удалений удаляются, когда Redis снова ответит, чтобы
+    после сбоя в кэше не остались устаревшие значения. До этого чтения таких
+    ключей считаются промахами.
+    """
+
+    # сколько отложенных удалений помнить; остальные истекут по TTL
+    MAX_PENDING_DELETES = 10_000
+
     def __init__(
-        self, host=config.redis.HOST, port=config.redis.PORT, db=config.redis.DB
+        self,
+        host=config.redis.HOST,
+        port=config.redis.PORT,
+        db=config.redis.DB,
+        local_size: int = config.redis.LOCAL_SIZE,
+        local_ttl: float = config.redis.LOCAL_TTL,
+        channel: str = config.redis.INVALIDATION_CHANNEL,
+        batch_size: int = config.redis.BATCH_SIZE,
+        serializer: Serializer | None = None,
+        timeout: float = config.redis.TIMEOUT,
+        breaker: CircuitBreaker | None = None,
     ):
         self.host = host
         self.port = port
         self.db = db
         self.connection_pool = redis.ConnectionPool(
-            host=self.host, port=self.port, db=self.db
+            host=self.host, port=self.port, db=self.db, socket_connect_timeout=1
         )
         self.redis_cache = redis.StrictRedis(connection_pool=self.connection_pool)
+        self.local = LocalCache(local_size, local_ttl) if local_size else None
+        self.channel = channel
+        self.batch_size = batch_size
+        self.serializer = serializer or Serializer()
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker(
+            config.redis.BREAKER_THRESHOLD, config.redis.BREAKER_RESET
+        )
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._pending_deletes: set[str] = set()
+        self._flush_task: asyncio.Task | None = None
+        self._subscribed = False
+        self._listener: asyncio.Task | None = None
+        # растёт с каждым сообщением об инвалидации: значение, прочитанное из Redis
+        # до сообщения, могло устареть и в локальный кэш не кладётся
+        self._generation = 0
+        # вычисления get_or_compute, идущие в этом процессе, по ключу
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._watchers: dict[str, list[Callable[[], None]]] = defaultdict(list)
+
+    @property
+    def local_enabled(self) -> bool:
+        return self.local is not None and self._subscribed
+
+    async def _execute(self, command: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.breaker.allow():
+            raise CacheUnavailable("circuit breaker is open")
+        try:
+            async with asyncio.timeout(self.timeout):
+                result = await command()
+        except (RedisError, TimeoutError) as e:
+            self.errors += 1
+            self.breaker.record_failure()
+            raise CacheUnavailable(repr(e)) from e
+        except BaseException:
+            # отменённый пробный вызов не должен оставить breaker в half_open:
+            # новых проб не будет, и Redis не используется до перезапуска
+            if self.breaker.state == self.breaker.HALF_OPEN:
+                self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        if self._pending_deletes and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_pending_deletes())
+        return result
+
+    async def _execute_pipeline(self, fill: Callable[[Any], None]) -> list:
+        async def command():
+            async with self.redis_cache.pipeline(transaction=False) as pipe:
+                fill(pipe)
+                return await pipe.execute()
+
+        return await self._execute(command)
+
+    def _defer_delete(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            if len(self._pending_deletes) >= self.MAX_PENDING_DELETES:
+                return
+            self._pending_deletes.add(key)
+
+    async def _flush_pending_deletes(self) -> None:
+        # ключи остаются в _pending_deletes, пока DEL не прошёл: до этого
+        # get и get_many считают их промахами
+        keys = list(self._pending_deletes)
+        try:
+            await self.delete_many(keys)
+        finally:
+            self._flush_task = None
+
+    def _invalidate(self, pipe, *keys: str) -> None:
+        # локальная копия сбрасывается сразу, остальные воркеры - по сообщению
+        if self.local is not None:
+            for key in keys:
+                self.local.pop(key)
+        else:
+            # без L1 сообщения нужны только подписчикам watch
+            keys = tuple(key for key in keys if key in self._watchers)
+        if keys:
+            pipe.publish(self.channel, json.dumps(keys))
 
     async def set(self, key: str, value: str, expire: int = 60):
+        def fill(pipe):
+            pipe.set(key, value, expire)
+            self._invalidate(pipe, key)
+
         try:
-            await self.redis_cache.set(key, value, expire)
+            await self._execute_pipeline(fill)
         except RedisError:
-            return
+            # в Redis могло остаться старое значение
+            self._defer_delete([key])
+        else:
+            self._pending_deletes.discard(key)
 
-    async def get(self, key, decode="utf-8"):
-        res = await self.redis_cache.get(key)
-        if res:
+    async def get(self, key, decode: str | None = "utf-8"):
+        if key in self._pending_deletes:
+            # запись или удаление не дошли до Redis - значение там устарело
+            self.misses += 1
+            return None
+        res = self.local.get(key) if self.local_enabled else MISSING
+        if res is MISSING:
+            generation = self._generation
+            try:
+                res = await self._execute(functools.partial(self.redis_cache.get, key))
+            except RedisError:
+                return None
+            if res is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                if self.local_enabled and generation == self._generation:
+                    self.local.set(key, res)
+        if res and decode:
             return res.decode(decode)
         return res
 
+    async def set_object(self, key: str, value: Any, expire: int = 60):
+        """Записывает словарь, список или pydantic-схему через serializer."""
+        await self.set(key, self.serializer.dumps(value), expire)
+
+    async def get_object(self, key: str, schema: type[BaseModel] | None = None):
+        """
+        Читает значение, записанное set_object; None, если ключа нет или
+        значение не удалось декодировать.
+        """
+        data = await self.get(key, decode=None)
+        if data is None:
+            return None
+        try:
+            return self.serializer.loads(data, schema)
+        except CodecError:
+            return None
+
+    @staticmethod
+    def _batches(items: Sequence, size: int):
+        for start in range(0, len(items), size):
+            yield items[start : start + size]
+
+    async def get_many(
+        self, keys: Iterable[str], decode: str | None = "utf-8"
+    ) -> dict[str, Any]:
+        """
+        Возвращает {ключ: значение} для набора ключей одним MGET на каждые
+        batch_size ключей; отсутствующие ключи получают None, как в get.
+        """
+        keys = list(dict.fromkeys(keys))
+        values: dict[str, Any] = {}
+        # ключи, удаление которых ещё не дошло до Redis, - промахи, как в get
+        stale = [key for key in keys if key in self._pending_deletes]
+        values.update(dict.fromkeys(stale))
+        self.misses += len(stale)
+        missing = [key for key in keys if key not in self._pending_deletes]
+        if self.local_enabled:
+            candidates, missing = missing, []
+            for key in candidates:
+                if (value := self.local.get(key)) is MISSING:
+                    missing.append(key)
+                else:
+                    values[key] = value
+        generation = self._generation
+        for batch in self._batches(missing, self.batch_size):
+            try:
+                found = await self._execute(
+                    functools.partial(self.redis_cache.mget, batch)
+                )
+            except RedisError:
+                found = [None] * len(batch)
+            values.update(zip(batch, found, strict=True))
+        for key in missing:
+            if values[key] is None:
+                self.misses += 1
+                continue
+            self.hits += 1
+            if self.local_enabled and generation == self._generation:
+                self.local.set(key, values[key])
+        return {
+            key: values[key].decode(decode) if values[key] and decode else values[key]
+            for key in keys
+        }
+
+    async def set_many(
+        self, items: Mapping[str, str], expire: int | Mapping[str, int] = 60
+    ):
+        """
+        Записывает ключи конвейером по batch_size команд SET на round trip.
+
+        Args:
+            items: Словарь {ключ: значение}.
+            expire: TTL в секундах, общий или словарь {ключ: TTL}; ключи, которых
+            нет в словаре, получают TTL по умолчанию - 60 секунд.
+        """
+
+        def fill(pipe, batch):
+            for key, value in batch:
+                ttl = expire.get(key, 60) if isinstance(expire, Mapping) else expire
+                pipe.set(key, value, ttl)
+            self._invalidate(pipe, *(key for key, _ in batch))
+
+        batches = list(self._batches(list(items.items()), self.batch_size))
+        for index, batch in enumerate(batches):
+            try:
+                await self._execute_pipeline(functools.partial(fill, batch=batch))
+            except RedisError:
+                # незаписанные ключи могли остаться со старыми значениями
+                self._defer_delete(key for batch in batches[index:] for key, _ in batch)
+                return
+            self._pending_deletes.difference_update(key for key, _ in batch)
+
+    async def delete_many(self, keys: Iterable[str]):
+        """Удаляет ключи одной командой DEL на каждые batch_size ключей."""
+
+        def fill(pipe, batch):
+            pipe.delete(*batch)
+            self._invalidate(pipe, *batch)
+
+        for batch in self._batches(list(keys), self.batch_size):
+            try:
+                await self._execute_pipeline(functools.partial(fill, batch=batch))
+            except RedisError:
+                self._defer_delete(batch)
+            else:
+                self._pending_deletes.difference_update(batch)
+
+    @staticmethod
+    def _pack(value: str | bytes, delta: float, expires_at: float) -> bytes:
+        if isinstance(value, str):
+            value = value.encode()
+        return b"%.6f:%.3f:" % (delta, expires_at) + value
+
+    @staticmethod
+    def _unpack(envelope: bytes) -> tuple[float, float, bytes]:
+        delta, expires_at, value = envelope.split(b":", 2)
+        return float(delta), float(expires_at), value
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[str | bytes]],
+        expire: int = 60,
+        stale: int | None = None,
+        beta: float = 1.0,
+        lock_timeout: float = 10,
+        decode: str | None = "utf-8",
+    ):
+        """
+        Возвращает значение ключа, при промахе вычисляя его через compute. Защищает
+        источник от лавины запросов при истечении горячего ключа:
+
+        - одновременные промахи в процессе ждут одно вычисление (single-flight);
+        - между воркерами вычисление захватывает блокировку в Redis, остальные
+          ждут, пока значение появится;
+        - значение пересчитывается заранее, с вероятностью, растущей к концу
+          срока и со временем вычисления (XFetch), а после срока ещё stale
+          секунд отдаётся устаревшим, пока в фоне считается новое.
+
+        Значение хранится вместе со временем вычисления и сроком годности, поэтому
+        читать такой ключ нужно через get_or_compute, а не get.
+
+        Args:
+            key: Ключ кэша.
+            compute: Корутина без аргументов, возвращающая str или bytes.
+            Фоновый пересчёт выполняется вне запроса, поэтому она не должна
+            использовать сессию вызывающего кода.
+            expire: Срок годности значения, сек.
+            stale: Сколько секунд после срока отдавать устаревшее значение.
+            По умолчанию равно expire.
+            beta: Склонность к раннему пересчёту; 0 - только по истечении срока.
+            lock_timeout: Срок блокировки и максимальное ожидание чужого вычисления.
+            decode: Кодировка результата; None - вернуть bytes.
+        """
+        stale = expire if stale is None else stale
+        envelope = await self.get(key, decode=None)
+        if envelope is None:
+            future = self._start_compute(key, compute, expire, stale, lock_timeout)
+            value = await asyncio.shield(future)
+            if value is None:
+                # попали на фоновый пересчёт, уступивший блокировку другому воркеру
+                future = self._start_compute(key, compute, expire, stale, lock_timeout)
+                value = await asyncio.shield(future)
+        else:
+            delta, expires_at, value = self._unpack(envelope)
+            early = delta * beta * -math.log(1.0 - random.random())
+            if time.time() + early >= expires_at and key not in self._inflight:
+                self._start_compute(key, compute, expire, stale, lock_timeout, True)
+        return value.decode(decode) if decode else value
+
+    def _start_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[str | bytes]],
+        expire: int,
+        stale: int,
+        lock_timeout: float,
+        refresh: bool = False,
+    ) -> asyncio.Future:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(
+                self._compute(key, compute, expire, stale, lock_timeout, refresh)
+            )
+            self._inflight[key] = future
+            future.add_done_callback(self._compute_done(key))
+        return future
+
+    def _compute_done(self, key: str) -> Callable[[asyncio.Future], None]:
+        def done(future: asyncio.Future) -> None:
+            self._inflight.pop(key, None)
+            # ошибку фонового пересчёта некому получить: следующий запрос повторит
+            if not future.cancelled():
+                future.exception()
+
+        return done
+
+    async def _compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[str | bytes]],
+        expire: int,
+        stale: int,
+        lock_timeout: float,
+        refresh: bool,
+    ) -> bytes | None:
+        lock = self.redis_cache.lock(
+            f"lock:{key}", timeout=lock_timeout, blocking=False
+        )
+        try:
+            acquired = await self._execute(lock.acquire)
+        except RedisError:
+            acquired = None
+        if acquired is False:
+            if refresh:
+                # значение уже пересчитывает другой воркер
+                return None
+            deadline = time.monotonic() + lock_timeout
+            while time.monotonic() < deadline and not self.breaker.is_open:
+                await asyncio.sleep(0.05)
+                envelope = await self.get(key, decode=None)
+                if envelope is not None:
+                    return self._unpack(envelope)[2]
+        try:
+            started = time.monotonic()
+            value = await compute()
+            delta = time.monotonic() - started
+            envelope = self._pack(value, delta, time.time() + expire)
+            await self.set(key, envelope, expire + stale)
+            return self._unpack(envelope)[2]
+        finally:
+            if acquired:
+                with contextlib.suppress(RedisError):
+                    await self._execute(lock.release)
+
+    async def setbit(self, key: str, offset: int, value: int = 1, expire: int = 60):
+        def fill(pipe):
+            pipe.setbit(key, offset, value)
+            pipe.expire(key, expire)
+            self._invalidate(pipe, key)
+
+        try:
+            await self._execute_pipeline(fill)
+        except RedisError:
+            self._defer_delete([key])
+
+    async def setbits(self, key: str, offsets: Iterable[int], expire: int = 60):
+        def fill(pipe):
+            for offset in offsets:
+                pipe.setbit(key, offset, 1)
+            pipe.expire(key, expire)
+            self._invalidate(pipe, key)
+
+        try:
+            await self._execute_pipeline(fill)
+        except RedisError:
+            self._defer_delete([key])
+
     async def delete(self, key: str):
-        await self.redis_cache.delete(key)
-
-    # async def set_user(self, schema: UserModelSchema):
-    #     schema.created_at = schema.created_at.strftime("%Y-%m-%d %H:%M:%S")
-    #     schema.updated_at = schema.updated_at.strftime("%Y-%m-%d %H:%M:%S")
-    #     schema_string = json.dumps(schema.model_dump())
-    #     await self.set(
-    #         f"user:{str(schema.tg_id)}",
-    #         schema_string,
-    #         60 * 60 * 24 * 7,
-    #     )
-    #
-    # async def get_user(self, key: str) -> UserModelSchema | None:
-    #     res = await self.get(key)
-    #     if res:
-    #         schema = UserModelSchema.model_validate(json.loads(res))
-    #         schema.id = int(schema.id)
-    #         schema.tg_id = int(schema.tg_id)
-    #         # schema.created_at = datetime.datetime.strptime(
-    #         #     schema.created_at,
-    #         #     "%Y-%m-%d %H:%M:%S",
-    #         # )
-    #         # schema.updated_at = datetime.datetime.strptime(
-    #         #     schema.updated_at,
-    #         #     "%Y-%m-%d %H:%M:%S",
-    #         # )
-    #         return UserModelSchema.model_validate(schema)
-    #     return None
+        await self.delete_many([key])
+
+    async def add_expiring(self, key: str, member: str, expires_at: float):
+        """
+        Добавляет member в множество key до момента expires_at (unix time);
+        истёкшие элементы удаляются тем же конвейером.
+        """
+
+        def fill(pipe):
+            pipe.zadd(key, {member: expires_at})
+            pipe.zremrangebyscore(key, "-inf", time.time())
+
+        with contextlib.suppress(RedisError):
+            await self._execute_pipeline(fill)
+
+    async def get_unexpired(self, key: str) -> list[str] | None:
+        """Неистёкшие элементы множества add_expiring; None, если Redis недоступен."""
+        try:
+            members = await self._execute(
+                functools.partial(
+                    self.redis_cache.zrangebyscore, key, time.time(), "+inf"
+                )
+            )
+        except RedisError:
+            return None
+        return [member.decode() for member in members]
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.redis_cache.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    self._subscribed = True
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        self._generation += 1
+                        for key in json.loads(message["data"]):
+                            if self.local is not None:
+                                self.local.pop(key)
+                            for callback in self._watchers.get(key, ()):
+                                callback()
+            except RedisError:
+                pass
+            finally:
+                # пока подписки нет, сообщения об изменениях теряются
+                self._subscribed = False
+                if self.local is not None:
+                    self.local.clear()
+            await asyncio.sleep(1)
+
+    def watch(self, key: str, callback: Callable[[], None]) -> None:
+        """
+        Вызывает callback, когда ключ записан или удалён в любом воркере.
+        Сообщения приходят по каналу инвалидации, то есть только пока процесс
+        подписан на него (start_invalidation); для ключей с подписчиками они
+        публикуются и при выключенном L1.
+        """
+        self._watchers[key].append(callback)
+
+    async def start_invalidation(self) -> None:
+        """Подписывает процесс на инвалидацию и включает локальный кэш, если он
+        есть. Без L1 подписка всё равно нужна ключам из watch, которые могут быть
+        зарегистрированы и после запуска."""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop_invalidation(self) -> None:
+        if self._listener is None:
+            return
+        self._listener.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._listener
+        self._listener = None
+
+    def stats(self) -> dict[str, Any]:
+        """Статистика обоих уровней; промахи L1 - это обращения к Redis."""
+        total = self.hits + self.misses
+        return {
+            "local": self.local.stats() if self.local is not None else None,
+            "redis": {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "errors": self.errors,
+                "pending_deletes": len(self._pending_deletes),
+                "breaker": self.breaker.stats(),
+            },
+        }
 
 
 cache = Cache()
+
+
+def _tier_stats(field: str) -> dict[tuple[str, ...], float]:
+    stats = cache.stats()
+    return {
+        (tier,): stats[tier][field]
+        for tier in ("local", "redis")
+        if stats[tier] is not None
+    }
+
+
+registry.register(
+    Gauge("cache_hits", "Попадания в кэш", lambda: _tier_stats("hits"), ("tier",))
+)
+registry.register(
+    Gauge("cache_misses", "Промахи кэша", lambda: _tier_stats("misses"), ("tier",))
+)
+registry.register(
+    Gauge(
+        "cache_local_size",
+        "Ключей в локальном кэше процесса",
+        lambda: {(): cache.local.stats()["size"]} if cache.local is not None else {},
+    )
+)
+registry.register(
+    Gauge(
+        "cache_local_evictions",
+        "Ключи, вытесненные из локального кэша при переполнении",
+        lambda: (
+            {(): cache.local.stats()["evictions"]} if cache.local is not None else {}
+        ),
+    )
+)
+registry.register(
+    Gauge("cache_redis_errors", "Ошибки и таймауты Redis", lambda: {(): cache.errors})
+)
+registry.register(
+    Gauge(
+        "cache_pending_deletes",
+        "Удаления, отложенные до восстановления Redis",
+        lambda: {(): len(cache._pending_deletes)},
+    )
+)
+registry.register(
+    Gauge(
+        "cache_breaker_open",
+        "Circuit breaker Redis разомкнут (1) или замкнут (0)",
+        lambda: {(): int(cache.breaker.is_open)},
+    )
+)
+registry.register(
+    Gauge(
+        "cache_breaker_rejected",
+        "Вызовы Redis, отклонённые разомкнутым circuit breaker",
+        lambda: {(): cache.breaker.rejected},
+    )
+)
@@ -0,0 +1,151 @@
+import json
+import zlib
+
+from datetime import date
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from core.config import config
+
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+
+class CodecError(ValueError):
+    pass
+
+
+def to_primitive(value: Any) -> Any:
+    """Приводит значение к типам, которые есть во всех форматах: даты - ISO-строки."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, UUID | Decimal):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not serializable")
+
+
+class JsonCodec:
+    tag = b"j"
+
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return json.dumps(
+            value, default=to_primitive, separators=(",", ":"), ensure_ascii=False
+        ).encode()
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    tag = b"o"
+
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        # без OPT_PASSTHROUGH_DATETIME orjson пишет даты с "T" и смещением,
+        # как isoformat, так что результат читается любым кодеком
+        return orjson.dumps(value, default=to_primitive)
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackCodec:
+    tag = b"m"
+
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return msgpack.packb(value, default=to_primitive, datetime=False)
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return msgpack.unpackb(data)
+
+
+CODECS = {
+    "json": JsonCodec,
+    "orjson": OrjsonCodec if orjson is not None else None,
+    "msgpack": MsgpackCodec if msgpack is not None else None,
+}
+
+
+def get_codec(name: str = "auto"):
+    """
+    Кодек по имени; "auto" - самый быстрый из установленных (orjson, иначе json).
+    Если библиотеки запрошенного кодека нет, используется json.
+    """
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+    if name not in CODECS:
+        raise ValueError(f"Unknown codec {name!r}, expected one of {list(CODECS)}")
+    return CODECS[name] or JsonCodec
+
+
+class Serializer:
+    """
+    Превращает словари (например Base.to_dict) и pydantic-схемы в компактные
+    bytes и обратно. Первые два байта - метка кодека и сжатия, поэтому значения,
+    записанные другим кодеком или до смены настроек, читаются без ошибок, пока
+    установлена библиотека их кодека. Значения длиннее compress_threshold
+    сжимаются zlib - это в первую очередь длинные тексты Answer и AIAssessment.
+    """
+
+    RAW = b"-"
+    ZLIB = b"z"
+
+    def __init__(
+        self,
+        codec: str = config.redis.CODEC,
+        compress_threshold: int = config.redis.COMPRESS_THRESHOLD,
+        compress_level: int = 6,
+    ):
+        self.codec = get_codec(codec)
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+
+    def dumps(self, value: Any) -> bytes:
+        data = self.codec.dumps(value)
+        if self.compress_threshold and len(data) > self.compress_threshold:
+            compressed = zlib.compress(data, self.compress_level)
+            if len(compressed) < len(data):
+                return self.codec.tag + self.ZLIB + compressed
+        return self.codec.tag + self.RAW + data
+
+    def loads(self, data: bytes, schema: type[BaseModel] | None = None) -> Any:
+        """
+        Args:
+            data: Значение, записанное dumps.
+            schema: pydantic-схема, в которую проверяется результат.
+
+        Raises:
+            CodecError: Если значение повреждено, записано не через dumps или
+            его кодек не установлен.
+        """
+        tag, compression, payload = data[:1], data[1:2], data[2:]
+        codec = next(
+            (codec for codec in CODECS.values() if codec and codec.tag == tag), None
+        )
+        if codec is None or compression not in (self.RAW, self.ZLIB):
+            raise CodecError(f"Unknown cache value format {data[:2]!r}")
+        try:
+            if compression == self.ZLIB:
+                payload = zlib.decompress(payload)
+            value = codec.loads(payload)
+        except Exception as e:
+            raise CodecError("Corrupted cache value") from e
+        return schema.model_validate(value) if schema is not None else value
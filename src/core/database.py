@@ -1,13 +1,259 @@
-from collections.abc import AsyncGenerator
+import logging
+import random
+import re
+import time
 
+from collections import Counter as StatementCounter
+from collections.abc import AsyncGenerator, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import Engine, Select, event
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import ORMExecuteState, Session, raiseload
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from core.config import config
+from core.metrics import Counter, Gauge, Histogram, Registry, registry
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryMetrics:
+    """
+    Метрики запросов к Postgres по событиям движков SQLAlchemy: время выполнения
+    и число строк для каждого нормализованного запроса (литералы и параметры
+    заменены на ?, списки IN свёрнуты), ошибки и ожидание соединения из пула.
+
+    Внутри track() считается, сколько раз выполнен каждый запрос; если один и тот
+    же запрос повторился не меньше n_plus_one_threshold раз, это похоже на N+1:
+    запрос попадает в метрику db_n_plus_one_total и в лог.
+    """
+
+    OTHER = "other"
+    LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+    ROWS_BUCKETS = (0, 1, 10, 100, 1000, 10_000, 100_000)
+    # сколько исходных текстов запросов держать в кэше нормализации
+    NORMALIZE_CACHE_SIZE = 10_000
+
+    PARAMETER = re.compile(r"\$\d+|%\(\w+\)s|(?<![\w.])\d+(?:\.\d+)?\b")
+    STRING = re.compile(r"'(?:[^']|'')*'")
+    # asyncpg приводит параметры к типу: $1::BIGINT, $2::TIMESTAMP WITHOUT TIME ZONE
+    CAST = re.compile(
+        r"(?<=\?)::\w+(?:\s+WITH(?:OUT)?\s+TIME\s+ZONE)?(?:\[\])?", re.IGNORECASE
+    )
+    LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+    SPACE = re.compile(r"\s+")
+
+    def __init__(
+        self,
+        registry: Registry,
+        enabled: bool = True,
+        max_statements: int = 500,
+        n_plus_one_threshold: int = 10,
+    ) -> None:
+        self.enabled = enabled
+        self.max_statements = max_statements
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.engines: dict[str, AsyncEngine] = {}
+        self._labels: dict[str, str] = {}
+        self._statements: set[str] = set()
+        self._request: ContextVar[StatementCounter | None] = ContextVar(
+            "db_request_statements", default=None
+        )
+        self.latency = registry.register(
+            Histogram(
+                "db_query_duration_seconds",
+                "Время выполнения запроса",
+                self.LATENCY_BUCKETS,
+                ("statement",),
+            )
+        )
+        self.rows = registry.register(
+            Histogram(
+                "db_query_rows",
+                "Число строк, выбранных или изменённых запросом",
+                self.ROWS_BUCKETS,
+                ("statement",),
+            )
+        )
+        self.errors = registry.register(
+            Counter("db_query_errors_total", "Запросы с ошибкой", ("statement",))
+        )
+        self.checkout = registry.register(
+            Histogram(
+                "db_pool_checkout_seconds",
+                "Ожидание соединения из пула, включая открытие нового",
+                self.LATENCY_BUCKETS,
+            )
+        )
+        self.n_plus_one = registry.register(
+            Counter(
+                "db_n_plus_one_total",
+                "Запрос повторён в одном HTTP-запросе не меньше порога раз",
+                ("statement",),
+            )
+        )
+        registry.register(
+            Gauge(
+                "db_pool_checked_out",
+                "Соединения, выданные из пула",
+                lambda: {
+                    (name,): engine.sync_engine.pool.checkedout()
+                    for name, engine in self.engines.items()
+                },
+                ("engine",),
+            )
+        )
+
+    @classmethod
+    def normalize(cls, statement: str) -> str:
+        statement = cls.STRING.sub("?", statement)
+        statement = cls.PARAMETER.sub("?", statement)
+        statement = cls.CAST.sub("", statement)
+        statement = cls.LIST.sub("?, ...", statement)
+        return cls.SPACE.sub(" ", statement).strip()
+
+    def label(self, statement: str) -> str:
+        """Нормализованный запрос; сверх max_statements разных - "other"."""
+        label = self._labels.get(statement)
+        if label is not None:
+            return label
+        label = self.normalize(statement)
+        if label not in self._statements:
+            if len(self._statements) >= self.max_statements:
+                label = self.OTHER
+            else:
+                self._statements.add(label)
+        if len(self._labels) >= self.NORMALIZE_CACHE_SIZE:
+            self._labels.clear()
+        self._labels[statement] = label
+        return label
+
+    def instrument(self, engine: AsyncEngine, name: str) -> None:
+        if not self.enabled:
+            return
+        self.engines[name] = engine
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._before_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_execute)
+        event.listen(sync_engine, "handle_error", self._handle_error)
+
+    def _before_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def _after_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        label = self.label(statement)
+        self.latency.observe(elapsed, label)
+        if cursor.rowcount >= 0:
+            self.rows.observe(cursor.rowcount, label)
+        if (statements := self._request.get()) is not None:
+            statements[label] += 1
+
+    def _handle_error(self, exception_context) -> None:
+        started = exception_context.connection.info.get("query_started")
+        if started:
+            started.pop()
+        if exception_context.statement is not None:
+            self.errors.inc(self.label(exception_context.statement))
+
+    def observe_checkout(self, elapsed: float) -> None:
+        if self.enabled:
+            self.checkout.observe(elapsed)
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[StatementCounter]:
+        """Считает запросы внутри контекста (например, HTTP-запроса) для
+        поиска N+1."""
+        statements: StatementCounter = StatementCounter()
+        token = self._request.set(statements)
+        try:
+            yield statements
+        finally:
+            self._request.reset(token)
+            for label, count in statements.items():
+                if count >= self.n_plus_one_threshold:
+                    self.n_plus_one.inc(label)
+                    logger.warning(
+                        "Possible N+1 in %s: %d x %s", name, count, label[:200]
+                    )
+
+
+query_metrics = QueryMetrics(
+    registry,
+    enabled=config.db.metrics_enabled,
+    max_statements=config.db.metrics_max_statements,
+    n_plus_one_threshold=config.db.n_plus_one_threshold,
+)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Пул, замеряющий время получения соединения."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            query_metrics.observe_checkout(time.perf_counter() - started)
+
+
+class RoutingSession(Session):
+    """
+    Направляет SELECT на случайную реплику, а записи, SELECT ... FOR UPDATE и
+    всё остальное - на primary. После первой записи сессия "прилипает" к primary
+    до конца своей жизни (read-your-writes в рамках запроса).
+    """
+
+    USE_PRIMARY = "use_primary"
+    STRICT_LOADING = "strict_loading"
+
+    def __init__(self, *args, replicas: Sequence[Engine] = (), **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.replicas = list(replicas)
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs) -> Any:
+        if self._flushing or (clause is not None and not isinstance(clause, Select)):
+            self.info[self.USE_PRIMARY] = True
+        elif (
+            self.replicas
+            and not self.info.get(self.USE_PRIMARY)
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+        ):
+            return random.choice(self.replicas)
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def raise_on_lazy_load(state: ORMExecuteState) -> None:
+    """
+    В строгом режиме к каждому SELECT сущностей добавляется raiseload("*"):
+    отношения, не загруженные явно (joinedload, selectinload, профиль
+    репозитория), при обращении дают ошибку вместо ленивого запроса.
+    """
+    strict = state.session.info.get(
+        RoutingSession.STRICT_LOADING, config.db.strict_loading
+    )
+    if (
+        strict
+        and state.is_select
+        and not state.is_column_load
+        and not state.is_relationship_load
+    ):
+        state.statement = state.statement.options(raiseload("*"))
 
 
 class DatabaseHelper:
@@ -18,6 +264,7 @@ class DatabaseHelper:
         echo_pool: bool = False,
         pool_size: int = 30,
         max_overflow: int = 10,
+        replica_urls: Sequence[str] = (),
     ) -> None:
         self.engine: AsyncEngine = create_async_engine(
             url=url,
@@ -25,21 +272,58 @@ class DatabaseHelper:
             echo_pool=echo_pool,
             pool_size=pool_size,
             max_overflow=max_overflow,
+            poolclass=InstrumentedPool,
         )
+        self.replica_engines: list[AsyncEngine] = [
+            create_async_engine(
+                url=replica_url,
+                echo=echo,
+                echo_pool=echo_pool,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                poolclass=InstrumentedPool,
+            )
+            for replica_url in replica_urls
+        ]
+        query_metrics.instrument(self.engine, "primary")
+        for index, engine in enumerate(self.replica_engines):
+            query_metrics.instrument(engine, f"replica{index}")
         self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
             bind=self.engine,
             autoflush=False,
             autocommit=False,
             expire_on_commit=False,
+            sync_session_class=RoutingSession,
+            replicas=[engine.sync_engine for engine in self.replica_engines],
         )
 
     async def dispose(self) -> None:
         await self.engine.dispose()
+        for engine in self.replica_engines:
+            await engine.dispose()
 
     async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
         async with self.session_factory() as session:
             yield session
 
+    @staticmethod
+    def use_primary(session: AsyncSession) -> None:
+        """Все дальнейшие запросы сессии, включая чтения, идут на primary."""
+        session.info[RoutingSession.USE_PRIMARY] = True
+
+    @staticmethod
+    def reads_primary(session: AsyncSession) -> bool:
+        """Идут ли чтения сессии на primary: реплик нет или сессия к нему
+        прилипла после записи или use_primary()."""
+        replicas = getattr(session.sync_session, "replicas", None)
+        return not replicas or bool(session.info.get(RoutingSession.USE_PRIMARY))
+
+    @staticmethod
+    def strict_loading(session: AsyncSession, enabled: bool = True) -> None:
+        """Включает или выключает строгую загрузку отношений для сессии
+        независимо от config.db.strict_loading."""
+        session.info[RoutingSession.STRICT_LOADING] = enabled
+
 
 db_conn = DatabaseHelper(
     url=config.db.url(),
@@ -47,4 +331,5 @@ db_conn = DatabaseHelper(
     echo_pool=config.db.echo_pool,
     pool_size=config.db.pool_size,
     max_overflow=config.db.max_overflow,
+    replica_urls=config.db.replicas,
 )
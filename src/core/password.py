@@ -0,0 +1,93 @@
+import asyncio
+
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from passlib.context import CryptContext
+
+from core.config import config
+from core.metrics import Gauge, registry
+
+
+class PasswordHasher:
+    """
+    Хэширование и проверка паролей bcrypt в отдельном пуле потоков: один вызов
+    занимает десятки миллисекунд процессорного времени и, выполненный прямо в
+    корутине, останавливает весь event loop. bcrypt отпускает GIL, поэтому
+    потоки считают параллельно. Одновременно выполняется не больше max_workers
+    вызовов, остальные ждут в очереди, длина которой видна в stats().
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int) -> None:
+        self.context = context
+        self.max_workers = max_workers
+        self.queued = 0
+        self.peak_queued = 0
+        self.running = 0
+        self.completed = 0
+        self._semaphore = asyncio.Semaphore(max_workers)
+        self._executor: ThreadPoolExecutor | None = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="bcrypt"
+            )
+        return self._executor
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        self.queued += 1
+        self.peak_queued = max(self.peak_queued, self.queued)
+        waiting = True
+        try:
+            async with self._semaphore:
+                self.queued -= 1
+                waiting = False
+                self.running += 1
+                try:
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self._get_executor(), func, *args)
+                finally:
+                    self.running -= 1
+                    self.completed += 1
+        finally:
+            if waiting:
+                self.queued -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(self.context.verify, password, hashed)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "max_workers": self.max_workers,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "running": self.running,
+            "completed": self.completed,
+        }
+
+
+password_hasher = PasswordHasher(config.auth.pwd_context, config.auth.hash_workers)
+
+for name, documentation in (
+    ("queued", "Хэширования паролей в очереди пула потоков"),
+    ("peak_queued", "Наибольшая очередь хэширования паролей"),
+    ("running", "Хэширования паролей, выполняемые сейчас"),
+    ("completed", "Завершённые хэширования паролей"),
+):
+    registry.register(
+        Gauge(
+            f"password_hasher_{name}",
+            documentation,
+            lambda name=name: {(): password_hasher.stats()[name]},
+        )
+    )
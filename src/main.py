@@ -1,9 +1,23 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 
 from admin.admin import init_admin
 from admin.auth import authentication_backend
+from core.cache import cache
 from core.config import config
-from core.database import db_conn
+from core.database import db_conn, query_metrics
+from core.metrics import registry
+from core.password import password_hasher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await cache.start_invalidation()
+    yield
+    await cache.stop_invalidation()
+    password_hasher.shutdown()
 
 
 app = FastAPI(
@@ -12,9 +26,21 @@ app = FastAPI(
     docs_url="/swagger/" if config.app.debug else None,
     redoc_url="/redoc/" if config.app.debug else None,
     debug=config.app.debug,
+    lifespan=lifespan,
 )
 
 
+@app.middleware("http")
+async def track_queries(request: Request, call_next):
+    with query_metrics.track(f"{request.method} {request.url.path}"):
+        return await call_next(request)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 # app.add_middleware(
 #     CORSMiddleware,
 #     allow_origins=config.cors.ALLOWED_HOSTS,
@@ -31,5 +57,6 @@ init_admin(
     title="SobesAdmin",
     app=app,
     engine=db_conn.engine,
+    session_maker=db_conn.session_factory,
     authentication_backend=authentication_backend,
 )
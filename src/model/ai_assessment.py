@@ -1,21 +1,25 @@
-from sqlalchemy import ForeignKey, Text
+from sqlalchemy import ForeignKey, Index, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from model.base import Base
+from model.base import Base, to_tsvector
 
 
 class AIAssessment(Base):
     __tablename__ = "ai_assessment"
+    __table_args__ = (
+        # сортировка и постраничный просмотр в админке по (created_at, id)
+        Index("ix_ai_assessment_created_at_id", "created_at", "id"),
+    )
 
     text: Mapped[str] = mapped_column(Text, nullable=False, doc="Текст оценки")
     user_id: Mapped[int] = mapped_column(
-        ForeignKey("user.id"), nullable=False, doc="ID пользователя"
+        ForeignKey("user.id"), nullable=False, index=True, doc="ID пользователя"
     )
     question_id: Mapped[int] = mapped_column(
-        ForeignKey("question.id"), nullable=False, doc="ID вопроса"
+        ForeignKey("question.id"), nullable=False, index=True, doc="ID вопроса"
     )
     answer_id: Mapped[int] = mapped_column(
-        ForeignKey("answer.id"), nullable=False, doc="ID ответа"
+        ForeignKey("answer.id"), nullable=False, index=True, doc="ID ответа"
     )
 
     user = relationship("User", back_populates="ai_assessments", uselist=False)
@@ -23,4 +27,21 @@ class AIAssessment(Base):
     answer = relationship("Answer", back_populates="ai_assessment", uselist=False)
 
     def __repr__(self):
-        return f"{self.text[:100]}..."
+        if (text := self._loaded("text")) is None:
+            return super().__repr__()
+        return f"{text[:100]}..."
+
+
+# полнотекстовый поиск (оператор search) и поиск по триграммам (оператор similar,
+# а также LIKE/ILIKE '%...%') по тексту
+Index(
+    "ix_ai_assessment_text_search",
+    to_tsvector(AIAssessment.text),
+    postgresql_using="gin",
+)
+Index(
+    "ix_ai_assessment_text_trgm",
+    AIAssessment.text,
+    postgresql_using="gin",
+    postgresql_ops={"text": "gin_trgm_ops"},
+)
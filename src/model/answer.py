@@ -1,18 +1,22 @@
-from sqlalchemy import ForeignKey, SmallInteger, Text
+from sqlalchemy import ForeignKey, Index, SmallInteger, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from model.base import Base
+from model.base import Base, to_tsvector
 
 
 class Answer(Base):
     __tablename__ = "answer"
+    __table_args__ = (
+        # сортировка и постраничный просмотр в админке по (created_at, id)
+        Index("ix_answer_created_at_id", "created_at", "id"),
+    )
 
     text: Mapped[str] = mapped_column(Text, nullable=False, doc="Текст ответа")
     user_id: Mapped[int] = mapped_column(
-        ForeignKey("user.id"), nullable=False, doc="ID пользователя"
+        ForeignKey("user.id"), nullable=False, index=True, doc="ID пользователя"
     )
     question_id: Mapped[int] = mapped_column(
-        ForeignKey("question.id"), nullable=False, doc="ID вопроса"
+        ForeignKey("question.id"), nullable=False, index=True, doc="ID вопроса"
     )
     score: Mapped[int] = mapped_column(
         SmallInteger, nullable=False, default=1, doc="Оценка ответа"
@@ -23,4 +27,21 @@ class Answer(Base):
     ai_assessment = relationship("AIAssessment", back_populates="answer", uselist=False)
 
     def __repr__(self):
-        return f"{self.text[:100]}..."
+        if (text := self._loaded("text")) is None:
+            return super().__repr__()
+        return f"{text[:100]}..."
+
+
+# полнотекстовый поиск (оператор search) и поиск по триграммам (оператор similar,
+# а также LIKE/ILIKE '%...%') по тексту
+Index(
+    "ix_answer_text_search",
+    to_tsvector(Answer.text),
+    postgresql_using="gin",
+)
+Index(
+    "ix_answer_text_trgm",
+    Answer.text,
+    postgresql_using="gin",
+    postgresql_ops={"text": "gin_trgm_ops"},
+)
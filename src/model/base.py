@@ -1,15 +1,37 @@
 import uuid
 
 from datetime import datetime
-from typing import Annotated, TypeVar
-
-from sqlalchemy import TIMESTAMP, UUID, BigInteger, MetaData, inspect
+from typing import Annotated, Any, TypeVar
+
+from sqlalchemy import (
+    DDL,
+    TIMESTAMP,
+    UUID,
+    BigInteger,
+    MetaData,
+    event,
+    inspect,
+    text,
+)
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 from core.config import config
 
 
 TIMESTAMP_WITH_TIMEZONE = TIMESTAMP(timezone=True)
+# конфигурация подставляется в SQL литералом: выражение в запросе должно
+# совпадать с выражением GIN-индекса, иначе планировщик индекс не использует
+TEXT_SEARCH_CONFIG = text(f"'{config.db.text_search_config}'::regconfig")
+
+
+def to_tsvector(column):
+    return postgresql.to_tsvector(TEXT_SEARCH_CONFIG, column)
+
+
+def to_tsquery(value):
+    """Запрос в синтаксисе поисковиков: слова, "фраза", or, -исключение."""
+    return postgresql.websearch_to_tsquery(TEXT_SEARCH_CONFIG, value)
 
 
 uuid_pk = Annotated[
@@ -60,9 +82,21 @@ class Base(DeclarativeBase):
     def to_dict(self):
         return {c.key: getattr(self, c.key) for c in inspect(self).mapper.column_attrs}
 
+    def _loaded(self, key: str, default: Any = None) -> Any:
+        """Значение уже загруженного атрибута или default - без запроса к базе,
+        поэтому безопасно в __repr__ и вне greenlet asyncio."""
+        if key in inspect(self).unloaded:
+            return default
+        return getattr(self, key)
+
     def __repr__(self) -> str:
-        return f"{self.id} | {self.verbose_name}"
+        return f"{self._loaded('id')} | {self.verbose_name}"
+
 
+# триграммные индексы (gin_trgm_ops) требуют расширения pg_trgm
+event.listen(
+    Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+)
 
 Model = TypeVar("Model", bound=type[Base])
 ModelObject = TypeVar("ModelObject", bound=Base)
@@ -1,7 +1,7 @@
-from sqlalchemy import Boolean, SmallInteger, Text
+from sqlalchemy import Boolean, Index, SmallInteger, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from model.base import Base
+from model.base import Base, to_tsvector
 
 
 class Question(Base):
@@ -23,4 +23,21 @@ class Question(Base):
     user_questions = relationship("UserQuestion", back_populates="question")
 
     def __repr__(self):
-        return self.text[:100] + "..."
+        if (text := self._loaded("text")) is None:
+            return super().__repr__()
+        return text[:100] + "..."
+
+
+# полнотекстовый поиск (оператор search) и поиск по триграммам (оператор similar,
+# а также LIKE/ILIKE '%...%') по тексту
+Index(
+    "ix_question_text_search",
+    to_tsvector(Question.text),
+    postgresql_using="gin",
+)
+Index(
+    "ix_question_text_trgm",
+    Question.text,
+    postgresql_using="gin",
+    postgresql_ops={"text": "gin_trgm_ops"},
+)
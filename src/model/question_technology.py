@@ -15,22 +15,22 @@ class QuestionTechnology(Base):
     technology_id: Mapped[int] = mapped_column(
         ForeignKey("technology.id"),
         nullable=False,
+        index=True,
         doc="Технология",
         name="technology_id",
     )
 
+    # загружаются только по запросу: профилем репозитория, joined_load/
+    # select_in_load или опциями админки
     question = relationship(
-        "Question",
-        back_populates="question_technologies",
-        uselist=False,
-        lazy="joined"
+        "Question", back_populates="question_technologies", uselist=False
     )
     technology = relationship(
-        "Technology",
-        back_populates="question_technologies",
-        uselist=False,
-        lazy="joined"
+        "Technology", back_populates="question_technologies", uselist=False
     )
 
     def __repr__(self):
-        return f"{str(self.question)[:20]} | {str(self.technology)[:10]}"
+        # незагруженные отношения заменяются id, а не подгружаются
+        question = self._loaded("question") or self._loaded("question_id")
+        technology = self._loaded("technology") or self._loaded("technology_id")
+        return f"{str(question)[:20]} | {str(technology)[:10]}"
@@ -14,7 +14,7 @@ class Technology(Base):
     )
 
     def __repr__(self):
-        return self.name
+        return self._loaded("name") or super().__repr__()
 
     def __str__(self):
-        return self.name
+        return repr(self)
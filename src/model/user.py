@@ -9,7 +9,9 @@ from model.base import Base
 class User(Base):
     __tablename__ = "user"
 
-    tg_id: Mapped[int] = mapped_column(BigInteger, doc="Telegram ID", nullable=False)
+    tg_id: Mapped[int] = mapped_column(
+        BigInteger, doc="Telegram ID", nullable=False, index=True
+    )
     tg_url: Mapped[str] = mapped_column(String, doc="Telegram URL", nullable=False)
     first_name: Mapped[str] = mapped_column(String, nullable=False, doc="Имя")
     last_name: Mapped[str] = mapped_column(
@@ -29,4 +31,6 @@ class User(Base):
     ai_assessments = relationship("AIAssessment", back_populates="user")
 
     def __repr__(self):
-        return f"{self.first_name} {self.last_name}"
+        if (first_name := self._loaded("first_name")) is None:
+            return super().__repr__()
+        return f"{first_name} {self._loaded('last_name', '')}"
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from model.base import Base
@@ -6,12 +6,18 @@ from model.base import Base
 
 class UserQuestion(Base):
     __tablename__ = "user_question"
+    __table_args__ = (
+        # сортировка и постраничный просмотр в админке по (created_at, id)
+        Index("ix_user_question_created_at_id", "created_at", "id"),
+        # просмотренные пользователем вопросы читаются index-only scan
+        Index("ix_user_question_user_id_question_id", "user_id", "question_id"),
+    )
 
     user_id: Mapped[int] = mapped_column(
         ForeignKey("user.id"), nullable=False, doc="ID пользователя"
     )
     question_id: Mapped[int] = mapped_column(
-        ForeignKey("question.id"), nullable=False, doc="ID вопроса"
+        ForeignKey("question.id"), nullable=False, index=True, doc="ID вопроса"
     )
 
     user = relationship("User", back_populates="user_questions", uselist=False)
@@ -1,11 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from model.ai_assessment import AIAssessment
-from repository.base import BaseRepository
+from repository.base import BaseRepository, LoadProfile
 
 
 class AIAssessmentRepository(BaseRepository):
     model = AIAssessment
+    load_profiles = {LoadProfile.WITH_QUESTION: [joinedload(AIAssessment.question)]}
 
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(session=session)
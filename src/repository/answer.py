@@ -1,11 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from model.answer import Answer
-from repository.base import BaseRepository
+from repository.base import BaseRepository, LoadProfile
 
 
 class AnswerRepository(BaseRepository):
     model = Answer
+    load_profiles = {LoadProfile.WITH_QUESTION: [joinedload(Answer.question)]}
 
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(session=session)
@@ -1,11 +1,48 @@
-from collections.abc import Sequence
-from typing import Any
+import base64
+import copy
+import dataclasses
+import functools
+import itertools
+import json
 
-from sqlalchemy import Select, and_, func, select
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Sequence
+from typing import Any, NamedTuple
+
+from sqlalchemy import (
+    Integer,
+    Select,
+    String,
+    UniqueConstraint,
+    and_,
+    bindparam,
+    func,
+    inspect,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import InstrumentedAttribute, joinedload, relationship, selectinload
+from sqlalchemy.orm import (
+    InstrumentedAttribute,
+    joinedload,
+    load_only,
+    raiseload,
+    relationship,
+    selectinload,
+)
+from sqlalchemy.orm.interfaces import ORMOption
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
 
-from model.base import Model, ModelObject
+from core.config import config
+from model.base import Model, ModelObject, to_tsquery, to_tsvector
+from repository.cache import dump_value, entity_cache, load_value
+from repository.loader import BatchLoader
+from repository.unit_of_work import UnitOfWork
 
 
 class FilterCondition:
@@ -21,89 +58,584 @@ class FilterCondition:
     ILIKE = "ilike"
     BETWEEN = "between"
     ANY = "any"
+    # полнотекстовый поиск: to_tsvector(column) @@ websearch_to_tsquery(value)
+    SEARCH = "search"
+    # поиск по триграммам pg_trgm: value похоже на часть текста (column %> value)
+    SIMILAR = "similar"
+
+    CONDITIONS_MAP = {
+        EXACT: lambda column, value: column == value,
+        NOT_EXACT: lambda column, value: column != value,
+        GT: lambda column, value: column > value,
+        GTE: lambda column, value: column >= value,
+        LT: lambda column, value: column < value,
+        LTE: lambda column, value: column <= value,
+        IN: lambda column, value: column.in_(value),
+        NOT_IN: lambda column, value: column.not_in(value),
+        LIKE: lambda column, value: column.like(f"%{value}%"),
+        ILIKE: lambda column, value: column.ilike(f"%{value}%"),
+        BETWEEN: lambda column, value: column.between(*value),
+        ANY: lambda column, value: column.any(value),
+        SEARCH: lambda column, value: to_tsvector(column).op("@@")(to_tsquery(value)),
+        SIMILAR: lambda column, value: column.op("%>")(value),
+    }
+    # те же условия, но значение подставляется через именованный bindparam,
+    # поэтому выражение можно собрать один раз и переиспользовать;
+    # ANY принимает произвольное выражение и не параметризуется
+    BOUND_CONDITIONS_MAP = {
+        EXACT: lambda column, name: column == bindparam(name),
+        NOT_EXACT: lambda column, name: column != bindparam(name),
+        GT: lambda column, name: column > bindparam(name),
+        GTE: lambda column, name: column >= bindparam(name),
+        LT: lambda column, name: column < bindparam(name),
+        LTE: lambda column, name: column <= bindparam(name),
+        IN: lambda column, name: column.in_(bindparam(name, expanding=True)),
+        NOT_IN: lambda column, name: column.not_in(bindparam(name, expanding=True)),
+        LIKE: lambda column, name: column.like(bindparam(name)),
+        ILIKE: lambda column, name: column.ilike(bindparam(name)),
+        BETWEEN: lambda column, name: column.between(
+            bindparam(f"{name}_from"), bindparam(f"{name}_to")
+        ),
+        SEARCH: lambda column, name: to_tsvector(column).op("@@")(
+            to_tsquery(bindparam(name, type_=String))
+        ),
+        SIMILAR: lambda column, name: column.op("%>")(bindparam(name, type_=String)),
+    }
+    # релевантность для сортировки результатов SEARCH и SIMILAR, больше - лучше
+    RANKS_MAP = {
+        SEARCH: lambda column, value: func.ts_rank_cd(
+            to_tsvector(column), to_tsquery(value)
+        ),
+        SIMILAR: lambda column, value: func.word_similarity(value, column),
+    }
 
     @classmethod
     def get_by_expr(cls, expr: str = EXACT):
-        conditions_map = {
-            cls.EXACT: lambda column, value: column == value,
-            cls.NOT_EXACT: lambda column, value: column != value,
-            cls.GT: lambda column, value: column > value,
-            cls.GTE: lambda column, value: column >= value,
-            cls.LT: lambda column, value: column < value,
-            cls.LTE: lambda column, value: column <= value,
-            cls.IN: lambda column, value: column.in_(value),
-            cls.NOT_IN: lambda column, value: column.not_in(value),
-            cls.LIKE: lambda column, value: column.like(f"%{value}%"),
-            cls.ILIKE: lambda column, value: column.ilike(f"%{value}%"),
-            cls.BETWEEN: lambda column, value: column.between(*value),
-            cls.ANY: lambda column, value: column.any(value),
-        }
-        return conditions_map.get(expr)
+        return cls.CONDITIONS_MAP.get(expr)
+
+    @classmethod
+    def get_bound_by_expr(cls, expr: str = EXACT):
+        return cls.BOUND_CONDITIONS_MAP.get(expr)
+
+    @classmethod
+    def get_rank_by_expr(cls, expr: str):
+        return cls.RANKS_MAP.get(expr)
+
+    @classmethod
+    def get_params(cls, name: str, value: Any, expr: str = EXACT) -> dict[str, Any]:
+        """Значения bindparam'ов для условия из BOUND_CONDITIONS_MAP."""
+        if expr in (cls.LIKE, cls.ILIKE):
+            return {name: f"%{value}%"}
+        if expr == cls.BETWEEN:
+            value_from, value_to = value
+            return {f"{name}_from": value_from, f"{name}_to": value_to}
+        return {name: value}
 
     @classmethod
     def get_filter(cls, value: Any, expr: str = EXACT):
         return {expr: value}
 
 
+class LoadProfile:
+    """
+    Имена наборов опций загрузки отношений для BaseRepository.using(). Кроме
+    общих IDS и FULL, репозиторий объявляет свои в load_profiles.
+    """
+
+    # только первичный и внешние ключи; обращение к отношениям - ошибка
+    IDS = "ids"
+    # отношение question через JOIN, остальные не загружаются
+    WITH_QUESTION = "with_question"
+    # все отношения модели: many-to-one через JOIN, коллекции - selectinload
+    FULL = "full"
+
+
+class StatementCache:
+    """
+    LRU-кэш собранных Select по "форме" запроса: модель, ключи и операторы
+    фильтров, загрузка отношений и сортировка. Значения фильтров передаются
+    при выполнении как bindparam'ы, поэтому одинаковые по форме вызовы получают
+    тот же объект Select и попадают в compiled cache SQLAlchemy и в кэш
+    prepared statements asyncpg без повторной сборки.
+    """
+
+    def __init__(self, maxsize: int = 500):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+        self._statements: OrderedDict[tuple, Select] = OrderedDict()
+
+    def get_or_build(self, shape: tuple | None, build: Callable[[], Select]) -> Select:
+        if shape is None:
+            self.uncacheable += 1
+            return build()
+        statement = self._statements.get(shape)
+        if statement is not None:
+            self.hits += 1
+            self._statements.move_to_end(shape)
+            return statement
+        self.misses += 1
+        statement = build()
+        if self.maxsize > 0:
+            self._statements[shape] = statement
+            if len(self._statements) > self.maxsize:
+                self._statements.popitem(last=False)
+        return statement
+
+    def clear(self) -> None:
+        self._statements.clear()
+        self.hits = self.misses = self.uncacheable = 0
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._statements),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "uncacheable": self.uncacheable,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+statement_cache = StatementCache(maxsize=config.db.statement_cache_size)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorPage(NamedTuple):
+    items: Sequence[ModelObject]
+    next_cursor: str | None
+    prev_cursor: str | None
+
+
+class Cursor:
+    """Непрозрачный курсор keyset-пагинации: направление и значения ключа."""
+
+    NEXT = "next"
+    PREV = "prev"
+
+    @classmethod
+    def encode(cls, direction: str, values: Sequence[Any]) -> str:
+        payload = json.dumps(
+            [direction, [dump_value(value) for value in values]],
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str, columns: Sequence) -> tuple[str, list[Any]]:
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            direction, values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        except (ValueError, TypeError) as e:
+            raise InvalidCursor(cursor) from e
+        if direction not in (cls.NEXT, cls.PREV) or len(values) != len(columns):
+            raise InvalidCursor(cursor)
+        try:
+            return direction, [
+                load_value(column, value)
+                for column, value in zip(columns, values, strict=True)
+            ]
+        except (ValueError, TypeError, NotImplementedError) as e:
+            raise InvalidCursor(cursor) from e
+
+
 class BaseRepository:
     model: Model = None  # type: ignore
+    # TTL записей в кэше Redis в секундах; None - кэширование выключено
+    cache_ttl: int | None = None
+    # поля, по которым get и find отдают запись из кэша: id и уникальные ключи
+    cache_keys: tuple[str, ...] = ("id",)
+    # поля, которые не попадают в кэш (секреты); у записи из кэша они не загружены
+    cache_exclude: tuple[str, ...] = ()
+    # собственные профили загрузки репозитория: имя -> опции запроса
+    load_profiles: dict[str, Sequence[ORMOption]] = {}
+    # профиль запросов этого экземпляра; None - как объявлено в модели
+    profile: str | None = None
 
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    def _get_filters(self, filters: dict):
-        filter_conditions = []
+    def get_load_profiles(self) -> dict[str, Sequence[ORMOption]]:
+        mapper = inspect(self.model)
+        keys = [
+            getattr(self.model, attr.key)
+            for attr in mapper.column_attrs
+            if any(column.primary_key or column.foreign_keys for column in attr.columns)
+        ]
+        full = [
+            (
+                selectinload(relation.class_attribute)
+                if relation.uselist
+                else joinedload(relation.class_attribute)
+            )
+            for relation in mapper.relationships
+        ]
+        return {
+            LoadProfile.IDS: (load_only(*keys), raiseload("*")),
+            LoadProfile.FULL: full,
+            **self.load_profiles,
+        }
+
+    def using(self, profile: str) -> "BaseRepository":
+        """
+        Копия репозитория, запросы которой загружают отношения по профилю:
+
+            await repository.using(LoadProfile.IDS).filter(question_id=1)
+
+        Профиль не влияет на count, exists, project и на load() через общий
+        BatchLoader сессии.
+
+        Raises:
+            ValueError: Если у репозитория нет такого профиля.
+        """
+        if profile not in self.get_load_profiles():
+            raise ValueError(f"{type(self).__name__}: неизвестный профиль {profile!r}")
+        repository = copy.copy(self)
+        repository.profile = profile
+        return repository
+
+    async def _save(self, commit: bool) -> None:
+        # внутри UnitOfWork commit и flush выполняются один раз на выходе из него
+        if UnitOfWork.get(self.session) is not None:
+            return
+        await self.session.commit() if commit else await self.session.flush()
+
+    async def _cache_write(self, instance: ModelObject, commit: bool) -> None:
+        """
+        Write-through: после commit запись кладётся в кэш. Без commit запись только
+        удаляется из кэша, чтобы не закэшировать изменения, которые могут быть
+        откачены.
+        """
+        if self.cache_ttl is None:
+            return
+        if (unit_of_work := UnitOfWork.get(self.session)) is not None:
+            if instance.id is not None:
+                await entity_cache.delete(self.model, instance.id)
+            unit_of_work.on_commit(entity_cache.set, self, instance)
+        elif commit:
+            await entity_cache.set(self, instance)
+        else:
+            await entity_cache.delete(self.model, instance.id)
+
+    async def _cache_invalidate(self, *pks: Any) -> None:
+        """
+        Удаляет записи из кэша сразу и ещё раз после commit UnitOfWork, чтобы
+        конкурентное чтение не вернуло в кэш старые данные до фиксации транзакции.
+        """
+        if self.cache_ttl is None or not pks:
+            return
+        await entity_cache.delete(self.model, *pks)
+        if (unit_of_work := UnitOfWork.get(self.session)) is not None:
+            unit_of_work.on_commit(entity_cache.delete, self.model, *pks)
+
+    def _get_cache_field(self, filters: dict, *options: Any) -> str | None:
+        """Поле из cache_keys, если запрос - поиск по одному его значению."""
+        # с профилем загрузки запись может быть неполной (load_only) - мимо кэша
+        if (
+            self.cache_ttl is None
+            or self.profile is not None
+            or any(options)
+            or len(filters) != 1
+        ):
+            return None
+        ((field, value),) = filters.items()
+        if field not in self.cache_keys or value is None or isinstance(value, dict):
+            return None
+        return field
+
+    @property
+    def loader(self) -> BatchLoader:
+        """Загрузчик по id, общий для всех репозиториев модели в этой сессии."""
+        loaders = self.session.info.setdefault("batch_loaders", {})
+        # cache_ttl экземпляра может отличаться от объявленного в классе
+        # (бенчмарки отключают кэш), поэтому он входит в ключ загрузчика
+        key = (self.model, self.cache_ttl)
+        if key not in loaders:
+            # загрузчик общий, поэтому без профиля этого экземпляра (using)
+            repository = type(self)(self.session)
+            repository.cache_ttl = self.cache_ttl
+            loaders[key] = BatchLoader(repository)
+        return loaders[key]
+
+    async def load(self, pk: Any) -> ModelObject | None:
+        """
+        Возвращает запись модели по id или None. Вызовы, сделанные в одном проходе
+        event loop (например, через asyncio.gather), объединяются в один запрос
+        WHERE id IN (...); записи, уже загруженные в сессию, берутся из identity map.
+        Если у репозитория задан cache_ttl, пачка сначала ищется в кэше Redis.
+
+        Args:
+            pk: id записи.
+
+        Returns:
+            ModelObject | None: Запись модели или None, если не найдена.
+        """
+        return await self.loader.load(pk)
+
+    async def load_many(self, pks: Sequence[Any]) -> list[ModelObject | None]:
+        """
+        Возвращает записи модели по списку id одним запросом, в порядке pks.
+        Для ненайденных id на соответствующей позиции стоит None. Как и load,
+        при заданном cache_ttl сначала смотрит в кэш Redis.
+        """
+        return await self.loader.load_many(pks)
+
+    @staticmethod
+    @functools.cache
+    def _get_column(model: Model, key: str) -> InstrumentedAttribute:
+        return getattr(model, key)
+
+    @staticmethod
+    def _iter_filters(filters: dict):
         for key, value in filters.items():
-            column = getattr(self.model, key)
             if not isinstance(value, dict):
                 value = {FilterCondition.EXACT: value}
             for operator, operand in value.items():
-                condition = FilterCondition.get_by_expr(operator)
-                if condition:
-                    filter_conditions.append(condition(column, operand))
+                if FilterCondition.get_by_expr(operator):
+                    yield key, operator, operand
+
+    @staticmethod
+    def _is_bound(operator: str, operand: Any) -> bool:
+        # сравнение с None должно остаться IS NULL, а не "= NULL" с параметром
         return (
-            and_(*filter_conditions)
-            if len(filter_conditions) > 1
-            else filter_conditions[0]
+            operand is not None
+            and FilterCondition.get_bound_by_expr(operator) is not None
         )
 
-    def get_statement(
+    @staticmethod
+    def _get_clause_key(item) -> tuple | None:
+        cache_key = item._generate_cache_key()
+        if cache_key is None or cache_key.bindparams:
+            return None
+        return cache_key.key
+
+    def _get_shape(
         self,
-        excludes: dict[InstrumentedAttribute, Any] | None = None,
-        joined_load: list[relationship] | None = None,  # type: ignore
-        select_in_load: list[relationship] | None = None,  # type: ignore
-        order_by: list[InstrumentedAttribute] | None = None,
-        limit: int | None = None,
-        offset: int | None = None,
-        count: bool = False,
-        **filters,
-    ) -> Select:
-        statement = (
-            select(self.model)
-            if not count
-            else select(func.count(1)).select_from(self.model)
+        excludes: dict[InstrumentedAttribute, Any] | None,
+        joined_load: list[relationship] | None,  # type: ignore
+        select_in_load: list[relationship] | None,  # type: ignore
+        order_by: list[InstrumentedAttribute] | None,
+        limit: int | None,
+        offset: int | None,
+        columns: list[InstrumentedAttribute] | None,
+        count: bool,
+        exists: bool,
+        for_update: bool,
+        filters: dict,
+    ) -> tuple | None:
+        """
+        Ключ StatementCache для набора аргументов get_statement или None, если
+        запрос содержит непараметризуемые значения (например, оператор ANY).
+        """
+        filters_shape = []
+        for key, operator, operand in self._iter_filters(filters):
+            if self._is_bound(operator, operand):
+                filters_shape.append((key, operator))
+            elif operand is None:
+                filters_shape.append((key, operator, None))
+            else:
+                return None
+        clauses_shape = []
+        for items in (excludes, joined_load, select_in_load, order_by, columns):
+            if items is None:
+                clauses_shape.append(None)
+                continue
+            keys = tuple(self._get_clause_key(item) for item in items)
+            if None in keys:
+                return None
+            clauses_shape.append(keys)
+        excludes_shape = tuple(value is None for value in (excludes or {}).values())
+        return (
+            self.model,
+            self.profile,
+            count,
+            exists,
+            for_update,
+            tuple(filters_shape),
+            excludes_shape,
+            *clauses_shape,
+            limit is not None,
+            offset is not None,
         )
-        if filters:
-            filter_query = self._get_filters(filters)
-            statement = statement.filter(filter_query)
+
+    def _build_statement(
+        self,
+        excludes: dict[InstrumentedAttribute, Any] | None,
+        joined_load: list[relationship] | None,  # type: ignore
+        select_in_load: list[relationship] | None,  # type: ignore
+        order_by: list[InstrumentedAttribute] | None,
+        limit: int | None,
+        offset: int | None,
+        columns: list[InstrumentedAttribute] | None,
+        count: bool,
+        exists: bool,
+        for_update: bool,
+        filters: dict,
+    ) -> Select:
+        if count:
+            statement = select(func.count(1)).select_from(self.model)
+        elif columns:
+            statement = select(*columns).select_from(self.model)
+        else:
+            statement = select(self.model)
+        filter_conditions = []
+        for key, operator, operand in self._iter_filters(filters):
+            column = self._get_column(self.model, key)
+            if self._is_bound(operator, operand):
+                condition = FilterCondition.get_bound_by_expr(operator)
+                filter_conditions.append(condition(column, f"{key}__{operator}"))
+            else:
+                condition = FilterCondition.get_by_expr(operator)
+                filter_conditions.append(condition(column, operand))
+        if filter_conditions:
+            statement = statement.filter(and_(*filter_conditions))
         if excludes:
             for field, value in excludes.items():
-                statement = statement.where(field != value)
+                operand = (
+                    bindparam(f"excludes__{field.key}") if value is not None else None
+                )
+                statement = statement.where(field != operand)
         if joined_load:
             statement = statement.options(*[joinedload(item) for item in joined_load])
         if select_in_load:
             statement = statement.options(
                 *[selectinload(item) for item in select_in_load]
             )
+        if self.profile is not None and not (count or columns or exists):
+            statement = statement.options(*self.get_load_profiles()[self.profile])
         if offset is not None:
-            statement = statement.offset(offset)
+            statement = statement.offset(bindparam("statement_offset", type_=Integer))
         if limit is not None:
-            statement = statement.limit(limit)
+            statement = statement.limit(bindparam("statement_limit", type_=Integer))
         if not count:
             order_by = order_by if order_by is not None else self.model.ordering()
             statement = statement.order_by(*order_by)
+        if for_update:
+            statement = statement.with_for_update()
+        if exists:
+            statement = select(1).where(statement.exists())
         return statement
 
+    def _get_params(
+        self,
+        excludes: dict[InstrumentedAttribute, Any] | None,
+        limit: int | None,
+        offset: int | None,
+        filters: dict,
+    ) -> dict[str, Any]:
+        params = {}
+        for key, operator, operand in self._iter_filters(filters):
+            if self._is_bound(operator, operand):
+                params.update(
+                    FilterCondition.get_params(f"{key}__{operator}", operand, operator)
+                )
+        for field, value in (excludes or {}).items():
+            if value is not None:
+                params[f"excludes__{field.key}"] = value
+        if offset is not None:
+            params["statement_offset"] = offset
+        if limit is not None:
+            params["statement_limit"] = limit
+        return params
+
+    def _get_statement(
+        self,
+        excludes: dict[InstrumentedAttribute, Any] | None = None,
+        joined_load: list[relationship] | None = None,  # type: ignore
+        select_in_load: list[relationship] | None = None,  # type: ignore
+        order_by: list[InstrumentedAttribute] | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+        columns: list[InstrumentedAttribute] | None = None,
+        count: bool = False,
+        exists: bool = False,
+        for_update: bool = False,
+        **filters,
+    ) -> tuple[Select, dict[str, Any]]:
+        """
+        Возвращает закэшированный по форме Select и значения его параметров
+        для передачи в session.execute/scalars.
+        """
+        args = (
+            excludes,
+            joined_load,
+            select_in_load,
+            order_by,
+            limit,
+            offset,
+            columns,
+            count,
+            exists,
+            for_update,
+            filters,
+        )
+        statement = statement_cache.get_or_build(
+            self._get_shape(*args), lambda: self._build_statement(*args)
+        )
+        return statement, self._get_params(excludes, limit, offset, filters)
+
+    def _get_keyset(self, order_by: list | None = None) -> list[tuple[Any, bool]]:
+        """
+        Возвращает ключ сортировки для keyset-пагинации: пары (колонка, по убыванию).
+        Последним элементом всегда идёт id, чтобы ключ был уникальным.
+        """
+        keyset = []
+        for item in order_by if order_by is not None else self.model.ordering():
+            if isinstance(item, UnaryExpression):
+                keyset.append((item.element, item.modifier is operators.desc_op))
+            else:
+                keyset.append((item, False))
+        if not any(column.key == self.model.id.key for column, _ in keyset):
+            keyset.append((self.model.id, keyset[-1][1] if keyset else False))
+        return keyset
+
+    @staticmethod
+    def _get_seek_condition(keyset: list[tuple[Any, bool]], values: list[Any]):
+        """
+        Условие "строго после значений ключа" с учётом направления сортировки.
+        Для однонаправленного ключа используется сравнение кортежей (row value),
+        которое Postgres выполняет по составному индексу.
+        """
+        directions = {descending for _, descending in keyset}
+        if len(directions) == 1:
+            left = tuple_(*[column for column, _ in keyset])
+            right = tuple_(*values)
+            return left < right if directions.pop() else left > right
+        conditions = []
+        for i, (column, descending) in enumerate(keyset):
+            equals = [keyset[j][0] == values[j] for j in range(i)]
+            seek = column < values[i] if descending else column > values[i]
+            conditions.append(and_(*equals, seek))
+        return or_(*conditions)
+
+    def get_statement(
+        self,
+        excludes: dict[InstrumentedAttribute, Any] | None = None,
+        joined_load: list[relationship] | None = None,  # type: ignore
+        select_in_load: list[relationship] | None = None,  # type: ignore
+        order_by: list[InstrumentedAttribute] | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+        count: bool = False,
+        **filters,
+    ) -> Select:
+        statement, params = self._get_statement(
+            excludes=excludes,
+            joined_load=joined_load,
+            select_in_load=select_in_load,
+            order_by=order_by,
+            limit=limit,
+            offset=offset,
+            count=count,
+            **filters,
+        )
+        return statement.params(params) if params else statement
+
     async def all(
         self,
         joined_load: list[relationship] | None = None,  # type: ignore
@@ -123,12 +655,12 @@ class BaseRepository:
         Returns:
             Sequence[ModelObject]: Список объектов модели.
         """
-        statement = self.get_statement(
+        statement, params = self._get_statement(
             joined_load=joined_load,
             select_in_load=select_in_load,
             order_by=order_by,
         )
-        result = await self.session.scalars(statement=statement)
+        result = await self.session.scalars(statement=statement, params=params)
         return result.all()
 
     async def count(
@@ -146,12 +678,12 @@ class BaseRepository:
         Returns:
             int: Количество записей модели.
         """
-        statement = self.get_statement(
+        statement, params = self._get_statement(
             count=True,
             excludes=excludes,
             **filters,
         )
-        result = await self.session.scalar(statement=statement)
+        result = await self.session.scalar(statement=statement, params=params)
         return result
 
     async def exists(
@@ -169,9 +701,10 @@ class BaseRepository:
         Returns:
             bool: True, если есть записи модели, иначе False.
         """
-        subquery = self.get_statement(excludes=excludes, **filters)
-        statement = select(1).where(subquery.exists())
-        result = await self.session.scalar(statement=statement)
+        statement, params = self._get_statement(
+            excludes=excludes, exists=True, **filters
+        )
+        result = await self.session.scalar(statement=statement, params=params)
         return bool(result)
 
     async def filter(
@@ -182,6 +715,7 @@ class BaseRepository:
         order_by: list[InstrumentedAttribute] | None = None,
         limit: int | None = None,
         offset: int | None = None,
+        for_update: bool = False,
         **filters,
     ) -> Sequence[ModelObject]:
         """
@@ -196,29 +730,237 @@ class BaseRepository:
             order_by: Список атрибутов для сортировки результата.
             limit: Максимальное количество результатов.
             offset: Порядковый номер начального результата (сдвиг).
+            for_update: Если True, блокирует строки (SELECT ... FOR UPDATE);
+            такой запрос всегда выполняется на primary.
             **filters: Именованные аргументы для добавления в фильтр запроса.
 
         Returns:
             Sequence[ModelObject]: Список записей модели.
         """
 
-        statement = self.get_statement(
+        statement, params = self._get_statement(
             excludes=excludes,
             joined_load=joined_load,
             select_in_load=select_in_load,
             order_by=order_by,
             limit=limit,
             offset=offset,
+            for_update=for_update,
             **filters,
         )
-        result = await self.session.scalars(statement=statement)
+        result = await self.session.scalars(statement=statement, params=params)
         return result.all()
 
+    def _get_projection_columns(
+        self, fields: Sequence[InstrumentedAttribute] | type
+    ) -> list[InstrumentedAttribute]:
+        if not isinstance(fields, type):
+            return list(fields)
+        if dataclasses.is_dataclass(fields):
+            names = [field.name for field in dataclasses.fields(fields)]
+        elif hasattr(fields, "__slots__"):
+            slots = fields.__slots__
+            names = [slots] if isinstance(slots, str) else list(slots)
+        else:
+            raise TypeError(f"{fields.__name__}: ожидается dataclass или __slots__")
+        return [self._get_column(self.model, name) for name in names]
+
+    async def project(
+        self,
+        fields: Sequence[InstrumentedAttribute] | type,
+        excludes: dict[InstrumentedAttribute, Any] | None = None,
+        order_by: list[InstrumentedAttribute] | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+        **filters,
+    ) -> list:
+        """
+        Возвращает только нужные колонки записей модели без создания ORM-объектов:
+        строки не попадают в identity map и не отслеживаются сессией, что в разы
+        дешевле по времени и памяти на больших выборках.
+
+        Args:
+            fields: Список колонок модели (например [Question.id, Question.text])
+            или класс-приёмник: dataclass или класс со __slots__, имена полей
+            которого совпадают с атрибутами модели.
+            excludes: Словарь атрибутов и значений для исключения из результата.
+            order_by: Список атрибутов для сортировки результата.
+            limit: Максимальное количество результатов.
+            offset: Порядковый номер начального результата (сдвиг).
+            **filters: Именованные аргументы для добавления в фильтр запроса.
+
+        Returns:
+            list: Строки Row с доступом к колонкам по имени или экземпляры
+            класса-приёмника, если fields - класс.
+        """
+        statement, params = self._get_statement(
+            excludes=excludes,
+            order_by=order_by,
+            limit=limit,
+            offset=offset,
+            columns=self._get_projection_columns(fields),
+            **filters,
+        )
+        result = await self.session.execute(statement=statement, params=params)
+        rows = result.all()
+        if isinstance(fields, type):
+            return list(itertools.starmap(fields, rows))
+        return rows
+
+    async def stream_chunks(
+        self,
+        chunk_size: int | None = None,
+        expunge: bool = True,
+        excludes: dict[InstrumentedAttribute, Any] | None = None,
+        select_in_load: list[relationship] | None = None,  # type: ignore
+        order_by: list[InstrumentedAttribute] | None = None,
+        **filters,
+    ) -> AsyncIterator[Sequence[ModelObject]]:
+        """
+        Итерирует записи модели пачками через серверный курсор (yield_per), не
+        загружая всю таблицу в память.
+
+        Args:
+            chunk_size: Количество записей в пачке.
+            По умолчанию config.db.stream_chunk_size.
+            expunge: Если True, пачка удаляется из сессии (identity map) после того,
+            как итерация перешла к следующей, и память не растёт с размером таблицы.
+            excludes: Словарь атрибутов и значений для исключения из результата.
+            select_in_load: Список отношений для использования selectinload.
+            Загружаются отдельным запросом на каждую пачку. joinedload
+            несовместим с yield_per для коллекций и не поддерживается.
+            order_by: Список атрибутов для сортировки результата.
+            **filters: Именованные аргументы для добавления в фильтр запроса.
+
+        Yields:
+            Sequence[ModelObject]: Очередная пачка записей модели.
+        """
+        chunk_size = chunk_size or config.db.stream_chunk_size
+        statement, params = self._get_statement(
+            excludes=excludes,
+            select_in_load=select_in_load,
+            order_by=order_by,
+            **filters,
+        )
+        result = await self.session.stream_scalars(
+            statement=statement,
+            params=params,
+            execution_options={"yield_per": chunk_size},
+        )
+        try:
+            async for chunk in result.partitions():
+                yield chunk
+                if expunge:
+                    for instance in chunk:
+                        self.session.expunge(instance)
+        finally:
+            await result.close()
+
+    async def stream(
+        self,
+        chunk_size: int | None = None,
+        expunge: bool = True,
+        excludes: dict[InstrumentedAttribute, Any] | None = None,
+        select_in_load: list[relationship] | None = None,  # type: ignore
+        order_by: list[InstrumentedAttribute] | None = None,
+        **filters,
+    ) -> AsyncIterator[ModelObject]:
+        """
+        То же, что stream_chunks, но отдаёт записи по одной.
+
+        Yields:
+            ModelObject: Очередная запись модели.
+        """
+        async for chunk in self.stream_chunks(
+            chunk_size=chunk_size,
+            expunge=expunge,
+            excludes=excludes,
+            select_in_load=select_in_load,
+            order_by=order_by,
+            **filters,
+        ):
+            for instance in chunk:
+                yield instance
+
+    async def paginate(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        excludes: dict[InstrumentedAttribute, Any] | None = None,
+        joined_load: list[relationship] | None = None,  # type: ignore
+        select_in_load: list[relationship] | None = None,  # type: ignore
+        order_by: list[InstrumentedAttribute] | None = None,
+        **filters,
+    ) -> CursorPage:
+        """
+        Возвращает страницу записей модели с keyset (cursor) пагинацией.
+        В отличие от offset, глубина страницы не влияет на время запроса: Postgres
+        сразу переходит к нужной позиции по индексу на колонки сортировки.
+
+        Args:
+            limit: Количество записей на странице.
+            cursor: Курсор из next_cursor/prev_cursor предыдущей страницы.
+            excludes: Словарь атрибутов и значений для исключения из результата.
+            joined_load: Список отношений для использования joinedload.
+            (many-to-one, one-to-one)
+            select_in_load: Список отношений для использования selectinload.
+            (one-to-many, many-to-many)
+            order_by: Список атрибутов сортировки (допускается .desc()).
+            По умолчанию Model.ordering(); id добавляется автоматически.
+            **filters: Именованные аргументы для добавления в фильтр запроса.
+
+        Returns:
+            CursorPage: Записи страницы и курсоры следующей и предыдущей страниц.
+
+        Raises:
+            InvalidCursor: Если курсор повреждён или не соответствует сортировке.
+        """
+        keyset = self._get_keyset(order_by)
+        direction, values = Cursor.NEXT, None
+        if cursor:
+            direction, values = Cursor.decode(cursor, [c for c, _ in keyset])
+        backward = direction == Cursor.PREV
+        # при движении назад сортировка инвертируется, а результат разворачивается
+        seek_keyset = [
+            (column, descending != backward) for column, descending in keyset
+        ]
+        statement, params = self._get_statement(
+            excludes=excludes,
+            joined_load=joined_load,
+            select_in_load=select_in_load,
+            order_by=[c.desc() if d else c.asc() for c, d in seek_keyset],
+            limit=limit + 1,
+            **filters,
+        )
+        if values is not None:
+            statement = statement.where(self._get_seek_condition(seek_keyset, values))
+        result = await self.session.scalars(statement=statement, params=params)
+        items = list(result.unique().all())
+        has_more = len(items) > limit
+        items = items[:limit]
+        if backward:
+            items.reverse()
+        if not items:
+            return CursorPage(items=items, next_cursor=None, prev_cursor=None)
+
+        def make_cursor(direction: str, instance: ModelObject) -> str:
+            key = [getattr(instance, column.key) for column, _ in keyset]
+            return Cursor.encode(direction, key)
+
+        has_next = has_more if not backward else values is not None
+        has_prev = has_more if backward else values is not None
+        return CursorPage(
+            items=items,
+            next_cursor=make_cursor(Cursor.NEXT, items[-1]) if has_next else None,
+            prev_cursor=make_cursor(Cursor.PREV, items[0]) if has_prev else None,
+        )
+
     async def get(
         self,
         excludes: dict[InstrumentedAttribute, Any] | None = None,
         joined_load: list[relationship] | None = None,  # type: ignore
         select_in_load: list[relationship] | None = None,  # type: ignore
+        for_update: bool = False,
         **filters,
     ) -> ModelObject:
         """
@@ -230,6 +972,8 @@ class BaseRepository:
             (many-to-one, one-to-one)
             select_in_load: Список отношений для использования selectinload.
             (one-to-many, many-to-many)
+            for_update: Если True, блокирует строки (SELECT ... FOR UPDATE);
+            такой запрос всегда выполняется на primary.
             **filters: Именованные аргументы для добавления в фильтр запроса.
 
         Returns:
@@ -239,14 +983,37 @@ class BaseRepository:
             NoResultFound: Если не найдена единственная запись
             MultipleResultsFound: Если найдено более одной записи.
         """
-        statement = self.get_statement(
+        pk = filters.get("id")
+        if (
+            filters.keys() == {"id"}
+            and pk is not None
+            and not isinstance(pk, dict)
+            and not (excludes or joined_load or select_in_load or for_update)
+            and self.profile is None
+        ):
+            # поиск только по id идёт через загрузчик и объединяется с другими
+            if (instance := await self.load(pk)) is None:
+                raise NoResultFound(f"{self.model.__name__} id={pk} not found")
+            return instance
+        cache_field = self._get_cache_field(
+            filters, excludes, joined_load, select_in_load, for_update
+        )
+        if cache_field and (
+            instance := await entity_cache.get(self, cache_field, filters[cache_field])
+        ):
+            return instance
+        statement, params = self._get_statement(
             excludes=excludes,
             joined_load=joined_load,
             select_in_load=select_in_load,
+            for_update=for_update,
             **filters,
         )
-        result = await self.session.execute(statement=statement)
-        return result.scalar_one()
+        result = await self.session.execute(statement=statement, params=params)
+        instance = result.scalar_one()
+        if cache_field:
+            await entity_cache.fill(self, instance)
+        return instance
 
     async def get_or_none(self, **filters):
         """
@@ -263,8 +1030,8 @@ class BaseRepository:
         Raises:
             MultipleResultsFound: Если найдено более одной записи.
         """
-        statement = self.get_statement(**filters)
-        result = await self.session.execute(statement=statement)
+        statement, params = self._get_statement(**filters)
+        result = await self.session.execute(statement=statement, params=params)
         return result.scalar_one_or_none()
 
     async def find(
@@ -273,6 +1040,7 @@ class BaseRepository:
         joined_load: list[relationship] | None = None,  # type: ignore
         select_in_load: list[relationship] | None = None,  # type: ignore
         order_by: list[InstrumentedAttribute] | None = None,
+        for_update: bool = False,
         **filters,
     ) -> ModelObject | None:
         """
@@ -286,22 +1054,92 @@ class BaseRepository:
             select_in_load: Список отношений для использования selectinload.
             (one-to-many, many-to-many)
             order_by: Список атрибутов для сортировки результата.
+            for_update: Если True, блокирует строки (SELECT ... FOR UPDATE);
+            такой запрос всегда выполняется на primary.
             **filters: Именованные аргументы для добавления в фильтр запроса.
 
         Returns:
             ModelObject | None: Первая запись модели, удовлетворяющая заданным фильтрам,
             или None, если не найдено ни одной.
         """
-        statement = self.get_statement(
+        cache_field = self._get_cache_field(
+            filters, excludes, joined_load, select_in_load, for_update
+        )
+        if cache_field and (
+            instance := await entity_cache.get(self, cache_field, filters[cache_field])
+        ):
+            return instance
+        statement, params = self._get_statement(
             excludes=excludes,
             joined_load=joined_load,
             select_in_load=select_in_load,
             order_by=order_by,
+            for_update=for_update,
             **filters,
         )
-        result = await self.session.scalar(statement=statement)
+        result = await self.session.scalar(statement=statement, params=params)
+        if cache_field and result is not None:
+            await entity_cache.fill(self, result)
         return result
 
+    async def search(
+        self,
+        field: str,
+        query: str,
+        expr: str = FilterCondition.SEARCH,
+        excludes: dict[InstrumentedAttribute, Any] | None = None,
+        joined_load: list[relationship] | None = None,  # type: ignore
+        select_in_load: list[relationship] | None = None,  # type: ignore
+        limit: int | None = 50,
+        offset: int | None = None,
+        **filters,
+    ) -> Sequence[ModelObject]:
+        """
+        Ищет записи по текстовому полю и возвращает их по убыванию релевантности.
+
+        Args:
+            field: Имя текстового поля, например "text".
+            query: Поисковый запрос.
+            expr: FilterCondition.SEARCH - полнотекстовый поиск по словам с учетом
+            словоформ, FilterCondition.SIMILAR - нечеткий поиск по триграммам,
+            устойчивый к опечаткам.
+            excludes: Словарь атрибутов и значений для исключения из результата.
+            joined_load: Список отношений для использования joinedload.
+            select_in_load: Список отношений для использования selectinload.
+            limit: Максимальное количество результатов.
+            offset: Порядковый номер начального результата (сдвиг).
+            **filters: Дополнительные фильтры запроса.
+
+        Returns:
+            Sequence[ModelObject]: Найденные записи, самые релевантные первыми.
+
+        Raises:
+            ValueError: Если expr не поддерживает ранжирование.
+        """
+        rank = FilterCondition.get_rank_by_expr(expr)
+        if rank is None:
+            raise ValueError(f"Оператор {expr!r} не поддерживает поиск")
+        conditions = filters.get(field)
+        if not isinstance(conditions, dict):
+            conditions = (
+                {} if conditions is None else {FilterCondition.EXACT: conditions}
+            )
+        statement, params = self._get_statement(
+            excludes=excludes,
+            joined_load=joined_load,
+            select_in_load=select_in_load,
+            order_by=[],
+            limit=limit,
+            offset=offset,
+            **{**filters, field: {**conditions, expr: query}},
+        )
+        column = self._get_column(self.model, field)
+        statement = statement.order_by(
+            rank(column, bindparam(f"{field}__{expr}")).desc(), self.model.id
+        )
+        result = await self.session.scalars(statement=statement, params=params)
+        return result.all()
+
     async def create(self, commit: bool = True, **model_data) -> ModelObject:
         """
         Создает новую запись модели и сохраняет ее в базе данных.
@@ -315,9 +1153,190 @@ class BaseRepository:
         """
         instance = self.model(**model_data)
         self.session.add(instance)
-        await self.session.commit() if commit else await self.session.flush()
+        await self._save(commit)
+        await self._cache_write(instance, commit)
         return instance  # type: ignore
 
+    def _get_unique_keys(self) -> list[tuple[str, ...]]:
+        """Наборы колонок первичного ключа, UNIQUE-ограничений и уникальных индексов."""
+        table = self.model.__table__
+        keys = [tuple(column.key for column in table.primary_key.columns)]
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint):
+                keys.append(tuple(column.key for column in constraint.columns))
+        for index in table.indexes:
+            if index.unique:
+                keys.append(tuple(column.key for column in index.columns))
+        return list(dict.fromkeys(keys))
+
+    def _get_conflict_fields(self) -> list[str]:
+        """Колонки единственного UNIQUE-ограничения модели помимо первичного ключа."""
+        primary_key, *unique_keys = self._get_unique_keys()
+        unique_keys = [key for key in unique_keys if set(key) != set(primary_key)]
+        if len(unique_keys) != 1:
+            raise ValueError(
+                f"{self.model.__name__}: укажите conflict_fields для upsert_many"
+            )
+        return list(unique_keys[0])
+
+    def _match_unique_key(self, fields: Sequence[str]) -> list[str] | None:
+        """Колонки уникального ключа, совпадающего с fields, для ON CONFLICT."""
+        for key in self._get_unique_keys():
+            if set(key) == set(fields):
+                return list(key)
+        return None
+
+    def _has_required_fields(self, values: dict[str, Any]) -> bool:
+        """
+        Хватает ли values для INSERT: Postgres проверяет NOT NULL до поиска
+        конфликта, поэтому upsert с неполными данными падает даже для
+        существующей строки.
+        """
+        return all(
+            column.key in values
+            for column in self.model.__table__.columns
+            if not column.nullable
+            and column.default is None
+            and column.server_default is None
+            and column.autoincrement is not True
+        )
+
+    @staticmethod
+    def _on_conflict_do_update(
+        statement: Insert, conflict_fields: list[str], update_fields: list[str]
+    ) -> Insert:
+        # при пустом update_fields нужен холостой SET, иначе RETURNING
+        # не вернёт существующую строку
+        set_fields = (
+            [*update_fields, "updated_at"] if update_fields else [conflict_fields[0]]
+        )
+        return statement.on_conflict_do_update(
+            index_elements=conflict_fields,
+            set_={field: statement.excluded[field] for field in set_fields},
+        )
+
+    async def _upsert_one(
+        self,
+        values: dict[str, Any],
+        conflict_fields: list[str],
+        update_fields: list[str],
+        commit: bool,
+    ) -> tuple[ModelObject, bool]:
+        """
+        Один INSERT ... ON CONFLICT DO UPDATE ... RETURNING. Флаг создания берётся
+        из системной колонки xmax: у только что вставленной строки она равна 0.
+        Конкурентные вызовы с тем же ключом ждут друг друга на уникальном индексе,
+        поэтому дубликатов и ошибок unique violation не возникает.
+        """
+        statement = self._on_conflict_do_update(
+            insert(self.model).values(**values), conflict_fields, update_fields
+        ).returning(self.model, literal_column("xmax = 0").label("created"))
+        result = await self.session.execute(
+            statement, execution_options={"populate_existing": True}
+        )
+        instance, created = result.one()
+        await self._save(commit)
+        await self._cache_write(instance, commit)
+        return instance, created
+
+    @staticmethod
+    def _chunks(items: Sequence[dict], chunk_size: int):
+        for start in range(0, len(items), chunk_size):
+            yield items[start : start + chunk_size]
+
+    async def create_many(
+        self,
+        items: Sequence[dict[str, Any]],
+        commit: bool = True,
+        chunk_size: int | None = None,
+    ) -> list[int]:
+        """
+        Создает записи модели пачками: один многострочный INSERT ... RETURNING id
+        на каждые chunk_size записей и одна транзакция на весь вызов.
+
+        Args:
+            items: Список словарей с атрибутами новых записей.
+            commit: Если True, сохраняет изменения в базе данных сразу.
+            chunk_size: Количество строк в одном INSERT.
+            По умолчанию config.db.bulk_chunk_size.
+
+        Returns:
+            list[int]: id созданных записей в порядке items.
+        """
+        chunk_size = chunk_size or config.db.bulk_chunk_size
+        statement = (
+            insert(self.model)
+            .returning(self.model.id, sort_by_parameter_order=True)
+            .execution_options(insertmanyvalues_page_size=chunk_size)
+        )
+        ids = []
+        for chunk in self._chunks(items, chunk_size):
+            result = await self.session.scalars(statement, chunk)
+            ids.extend(result.all())
+        await self._save(commit)
+        return ids
+
+    async def upsert_many(
+        self,
+        items: Sequence[dict[str, Any]],
+        conflict_fields: list[str] | None = None,
+        update_fields: list[str] | None = None,
+        commit: bool = True,
+        chunk_size: int | None = None,
+    ) -> list[int]:
+        """
+        Создает или обновляет записи модели пачками через многострочный
+        INSERT ... ON CONFLICT DO UPDATE ... RETURNING id.
+
+        Args:
+            items: Список словарей с атрибутами записей.
+            conflict_fields: Колонки уникального ограничения, по которому ищется
+            конфликт. По умолчанию колонки единственного UniqueConstraint модели,
+            например (question_id, technology_id) у QuestionTechnology.
+            update_fields: Колонки, обновляемые при конфликте. По умолчанию все
+            переданные колонки, кроме conflict_fields. Если список пуст, запись
+            не меняется, но её id всё равно возвращается.
+            commit: Если True, сохраняет изменения в базе данных сразу.
+            chunk_size: Количество строк в одном INSERT.
+            По умолчанию config.db.bulk_chunk_size.
+
+        Returns:
+            list[int]: id созданных или обновлённых записей. Записи с одинаковым
+            ключом конфликта схлопываются (побеждает последняя), порядок - по
+            первому появлению ключа в items.
+        """
+        chunk_size = chunk_size or config.db.bulk_chunk_size
+        conflict_fields = conflict_fields or self._get_conflict_fields()
+        # Postgres не позволяет одной команде обновить строку дважды
+        unique_items = {
+            tuple(item[field] for field in conflict_fields): item for item in items
+        }
+        items = list(unique_items.values())
+        if not items:
+            return []
+        if update_fields is None:
+            update_fields = [key for key in items[0] if key not in conflict_fields]
+        # у обновлённой строки остаётся старый id, поэтому порядок RETURNING
+        # по sentinel-колонке id не совпадает с items - id сопоставляются
+        # с items по ключу конфликта
+        key_columns = [getattr(self.model, field) for field in conflict_fields]
+        statement = (
+            self._on_conflict_do_update(
+                insert(self.model), conflict_fields, update_fields
+            )
+            .returning(self.model.id, *key_columns)
+            .execution_options(insertmanyvalues_page_size=chunk_size)
+        )
+        found = {}
+        for chunk in self._chunks(items, chunk_size):
+            result = await self.session.execute(statement, chunk)
+            for pk, *key in result.tuples():
+                found[tuple(key)] = pk
+        ids = [found[key] for key in unique_items]
+        await self._save(commit)
+        await self._cache_invalidate(*ids)
+        return ids
+
     async def update(
         self, instance: ModelObject, commit: bool = True, **model_data
     ) -> ModelObject:
@@ -335,7 +1354,8 @@ class BaseRepository:
         for key, value in model_data.items():
             setattr(instance, key, value)
         self.session.add(instance)
-        await self.session.commit() if commit else await self.session.flush()
+        await self._save(commit)
+        await self._cache_write(instance, commit)
         return instance
 
     async def delete(self, instance: ModelObject, commit: bool = True) -> None:
@@ -347,7 +1367,8 @@ class BaseRepository:
             instance: Экземпляр модели для удаления.
         """
         await self.session.delete(instance)
-        await self.session.commit() if commit else await self.session.flush()
+        await self._save(commit)
+        await self._cache_invalidate(instance.id)
 
     async def get_or_create(
         self, filters: list[str], commit: bool = True, **model_data
@@ -356,6 +1377,15 @@ class BaseRepository:
         Ищет существующую запись модели по заданным фильтрам или создаёт новую запись,
         если не найдена.
 
+        Если filters совпадают с уникальным ключом модели, выполняется один
+        INSERT ... ON CONFLICT ... RETURNING без гонки между поиском и созданием.
+        Иначе запись ищется через find и создаётся отдельным запросом.
+
+        Найденная через ON CONFLICT запись тоже проходит через DO UPDATE: Postgres
+        пишет новую версию строки без изменений (мёртвый кортеж для VACUUM) и
+        держит блокировку строки до конца транзакции, так что одновременные
+        get_or_create с тем же ключом выполняются по очереди.
+
         Args:
             commit: Если True, сохраняет изменения в базе данных сразу.
             filters: Список ключевых слов для поиска экземпляра модели.
@@ -370,6 +1400,13 @@ class BaseRepository:
         get_filters = {
             filter: model_data.get(filter) for filter in filters
         } or model_data
+        conflict_fields = self._match_unique_key(list(get_filters))
+        if (
+            conflict_fields
+            and None not in get_filters.values()
+            and self._has_required_fields(model_data)
+        ):
+            return await self._upsert_one(model_data, conflict_fields, [], commit)
         if instance := await self.find(**get_filters):
             created = False
             return instance, created
@@ -382,6 +1419,10 @@ class BaseRepository:
         Обновляет существующую запись модели по заданным фильтрам или создаёт новую
         запись, если не найдена.
 
+        Если filters совпадают с уникальным ключом модели, выполняется один
+        INSERT ... ON CONFLICT DO UPDATE ... RETURNING. Иначе запись ищется
+        через get_or_none и обновляется или создаётся отдельным запросом.
+
         Parameters:
             commit: Если True, сохраняет изменения в базе данных сразу.
             filters (dict[str, Any]): Словарь ключевых слов и значений для поиска
@@ -394,6 +1435,16 @@ class BaseRepository:
             создана (True) или найдена (False)
         """
         created = True
+        conflict_fields = self._match_unique_key(list(filters))
+        values = {**model_data, **filters}
+        if (
+            conflict_fields
+            and None not in filters.values()
+            and self._has_required_fields(values)
+        ):
+            return await self._upsert_one(
+                values, conflict_fields, list(model_data), commit
+            )
         if instance := await self.get_or_none(**filters):
             created = False
             return (
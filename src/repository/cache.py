@@ -0,0 +1,212 @@
+from collections import defaultdict
+from collections.abc import Sequence
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
+
+from redis import RedisError
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+
+from core.cache import Cache, cache
+from core.codec import CodecError
+from core.database import DatabaseHelper
+from core.metrics import Gauge, registry
+from model.base import Model, ModelObject
+
+
+if TYPE_CHECKING:
+    from repository.base import BaseRepository
+
+
+def dump_value(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def load_value(column, value: Any) -> Any:
+    if value is None:
+        return value
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is UUID:
+        return UUID(value)
+    return value
+
+
+class EntityCache:
+    """
+    Read-through/write-through кэш записей моделей в Redis. Данные записи лежат
+    под ключом по id, а для остальных ключей поиска (например tg_id) хранится
+    только ссылка на id - поэтому для инвалидации достаточно знать id записи.
+    Ошибки Redis не прерывают запрос: поиск просто уходит в базу.
+    """
+
+    def __init__(self, cache: Cache) -> None:
+        self.cache = cache
+        self.hits: dict[str, int] = defaultdict(int)
+        self.misses: dict[str, int] = defaultdict(int)
+
+    @staticmethod
+    def key(model: Model, field: str, value: Any) -> str:
+        return f"entity:{model.__tablename__}:{field}:{value}"
+
+    def dumps(self, repository: "BaseRepository", instance: ModelObject) -> bytes:
+        return self.cache.serializer.dumps(
+            {
+                key: value
+                for key, value in instance.to_dict.items()
+                if key not in repository.cache_exclude
+            }
+        )
+
+    def loads(self, repository: "BaseRepository", data: bytes) -> dict[str, Any]:
+        # исключённые поля не заполняются: у объекта из кэша они остаются
+        # незагруженными, в том числе в значениях, записанных до исключения
+        columns = repository.model.__mapper__.column_attrs
+        return {
+            key: load_value(columns[key].columns[0], value)
+            for key, value in self.cache.serializer.loads(data).items()
+            if key not in repository.cache_exclude
+        }
+
+    async def get(
+        self, repository: "BaseRepository", field: str, value: Any
+    ) -> ModelObject | None:
+        model, session = repository.model, repository.session
+        try:
+            pk = value
+            if field != "id":
+                pk = await self.cache.get(self.key(model, field, value))
+                # ссылка хранится строкой, а identity map ждёт тип первичного ключа
+                if pk is not None:
+                    pk = model.__mapper__.primary_key[0].type.python_type(pk)
+        except (RedisError, CodecError, ValueError):
+            pk = None
+        # объект уже в сессии: его нельзя перезаписывать данными из кэша,
+        # иначе пропадут незафиксированные изменения
+        instance = pk and session.identity_map.get(identity_key(model, pk))
+        if instance is not None:
+            return instance if getattr(instance, field) == value else None
+        try:
+            data = pk and await self.cache.get(self.key(model, "id", pk), decode=None)
+            values = self.loads(repository, data) if data else None
+        except (RedisError, CodecError):
+            values = None
+        # ссылка могла устареть, если значение поля у записи изменилось
+        if values is None or values.get(field) != value:
+            self.misses[model.__name__] += 1
+            return None
+        self.hits[model.__name__] += 1
+        return await self._merge(repository, values)
+
+    async def get_many(
+        self, repository: "BaseRepository", pks: Sequence[Any]
+    ) -> dict[Any, ModelObject]:
+        """Найденные в identity map или в кэше записи по id одним MGET."""
+        model, session = repository.model, repository.session
+        found = {}
+        for pk in pks:
+            if (
+                instance := session.identity_map.get(identity_key(model, pk))
+            ) is not None:
+                found[pk] = instance
+        keys = {self.key(model, "id", pk): pk for pk in pks if pk not in found}
+        # ошибки Redis get_many возвращает как промахи
+        data = await self.cache.get_many(keys, decode=None) if keys else {}
+        for key, pk in keys.items():
+            try:
+                values = self.loads(repository, data[key]) if data.get(key) else None
+            except CodecError:
+                values = None
+            if values is None:
+                self.misses[model.__name__] += 1
+                continue
+            self.hits[model.__name__] += 1
+            found[pk] = await self._merge(repository, values)
+        return found
+
+    @staticmethod
+    async def _merge(
+        repository: "BaseRepository", values: dict[str, Any]
+    ) -> ModelObject:
+        instance = repository.model(**values)
+        make_transient_to_detached(instance)
+        return await repository.session.merge(instance, load=False)
+
+    def _items(
+        self, repository: "BaseRepository", instance: ModelObject
+    ) -> dict[str, Any]:
+        model = repository.model
+        items = {self.key(model, "id", instance.id): self.dumps(repository, instance)}
+        for field in repository.cache_keys:
+            if field != "id" and (value := getattr(instance, field)) is not None:
+                items[self.key(model, field, value)] = instance.id
+        return items
+
+    async def set(self, repository: "BaseRepository", instance: ModelObject) -> None:
+        await self.cache.set_many(
+            self._items(repository, instance), repository.cache_ttl
+        )
+
+    async def fill(self, repository: "BaseRepository", instance: ModelObject) -> None:
+        """
+        Кладёт в кэш запись, прочитанную из базы. Чтение с реплики могло
+        вернуть отстающие данные, поэтому кэш заполняется только чтениями
+        с primary.
+        """
+        await self.fill_many(repository, [instance])
+
+    async def fill_many(
+        self, repository: "BaseRepository", instances: Sequence[ModelObject]
+    ) -> None:
+        """То же, что fill, для нескольких записей одним конвейером."""
+        if not instances or not DatabaseHelper.reads_primary(repository.session):
+            return
+        items = {}
+        for instance in instances:
+            items.update(self._items(repository, instance))
+        await self.cache.set_many(items, repository.cache_ttl)
+
+    async def delete(self, model: Model, *pks: Any) -> None:
+        try:
+            await self.cache.delete_many(self.key(model, "id", pk) for pk in pks)
+        except RedisError:
+            return
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        stats = {}
+        for name in self.hits.keys() | self.misses.keys():
+            hits, misses = self.hits[name], self.misses[name]
+            stats[name] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": hits / (hits + misses),
+            }
+        return stats
+
+
+entity_cache = EntityCache(cache)
+
+registry.register(
+    Gauge(
+        "entity_cache_hits",
+        "Попадания в кэш записей по модели",
+        lambda: {(model,): hits for model, hits in entity_cache.hits.items()},
+        ("model",),
+    )
+)
+registry.register(
+    Gauge(
+        "entity_cache_misses",
+        "Промахи кэша записей по модели",
+        lambda: {(model,): misses for model, misses in entity_cache.misses.items()},
+        ("model",),
+    )
+)
@@ -0,0 +1,103 @@
+import asyncio
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy.orm.util import identity_key
+
+from model.base import ModelObject
+from repository.cache import entity_cache
+
+
+if TYPE_CHECKING:
+    from repository.base import BaseRepository
+
+
+class BatchLoader:
+    """
+    Собирает загрузки по первичному ключу, сделанные в одном проходе event loop,
+    и выполняет их одним запросом WHERE id IN (...). Если у репозитория задан
+    cache_ttl, пачка сначала ищется в кэше Redis одним MGET, в базу уходят только
+    промахи, а прочитанные записи кладутся в кэш. Живёт в session.info, поэтому
+    общий для всех репозиториев одной модели в рамках сессии (запроса).
+    """
+
+    def __init__(self, repository: "BaseRepository") -> None:
+        self.repository = repository
+        self.session = repository.session
+        self.model = repository.model
+        self.calls = 0
+        self.identity_map_hits = 0
+        self.cache_hits = 0
+        self.batch_sizes: list[int] = []
+        self._pending: dict[Any, list[asyncio.Future]] = {}
+        self._scheduled = False
+        # ссылка на задачу запроса, иначе её может собрать сборщик мусора
+        self._task: asyncio.Task | None = None
+
+    async def load(self, pk: Any) -> ModelObject | None:
+        self.calls += 1
+        instance = self.session.identity_map.get(identity_key(self.model, pk))
+        if instance is not None:
+            self.identity_map_hits += 1
+            return instance
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(pk, []).append(future)
+        if not self._scheduled:
+            self._scheduled = True
+            # запрос уходит после того, как отработают все готовые к запуску
+            # корутины, успевшие добавить свои id в ту же пачку
+            loop.call_soon(self._start_dispatch)
+        return await future
+
+    def _start_dispatch(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._dispatch())
+
+    async def load_many(self, pks: Sequence[Any]) -> list[ModelObject | None]:
+        return list(await asyncio.gather(*[self.load(pk) for pk in pks]))
+
+    async def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        self._scheduled = False
+        found: dict[Any, ModelObject] | None = None
+        error: Exception | None = None
+        cached = self.repository.cache_ttl is not None
+        try:
+            hits = {}
+            if cached:
+                hits = await entity_cache.get_many(self.repository, list(pending))
+            self.cache_hits += len(hits)
+            misses = [pk for pk in pending if pk not in hits]
+            instances = []
+            if misses:
+                instances = await self.repository.filter(id={"in": misses}, order_by=[])
+                self.batch_sizes.append(sum(len(pending[pk]) for pk in misses))
+            if cached:
+                await entity_cache.fill_many(self.repository, instances)
+            found = {**hits, **{instance.id: instance for instance in instances}}
+        except Exception as e:
+            error = e
+        finally:
+            # при отмене задачи (CancelledError не наследует Exception)
+            # ожидающие вызовы load отменяются, а не зависают навсегда
+            for pk, futures in pending.items():
+                for future in futures:
+                    if future.done():
+                        continue
+                    if found is not None:
+                        future.set_result(found.get(pk))
+                    elif error is not None:
+                        future.set_exception(error)
+                    else:
+                        future.cancel()
+            self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "identity_map_hits": self.identity_map_hits,
+            "cache_hits": self.cache_hits,
+            "queries": len(self.batch_sizes),
+            "coalesced": list(self.batch_sizes),
+        }
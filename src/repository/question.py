@@ -1,11 +1,30 @@
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from model.question import Question
+from model.question_technology import QuestionTechnology
 from repository.base import BaseRepository
 
 
 class QuestionRepository(BaseRepository):
     model = Question
+    cache_ttl = 60 * 10
 
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(session=session)
+
+    async def get_published_catalog(self) -> list[tuple[int, int, int | None]]:
+        """
+        Возвращает (id, complexity, technology_id) опубликованных вопросов; вопрос
+        с несколькими технологиями встречается несколько раз, без технологий -
+        один раз с technology_id = None.
+        """
+        statement = (
+            select(Question.id, Question.complexity, QuestionTechnology.technology_id)
+            .outerjoin(
+                QuestionTechnology, QuestionTechnology.question_id == Question.id
+            )
+            .where(Question.published.is_(True))
+        )
+        result = await self.session.execute(statement)
+        return list(result.tuples().all())
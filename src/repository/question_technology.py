@@ -0,0 +1,15 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from model.question_technology import QuestionTechnology
+from repository.base import BaseRepository, LoadProfile
+
+
+class QuestionTechnologyRepository(BaseRepository):
+    model = QuestionTechnology
+    load_profiles = {
+        LoadProfile.WITH_QUESTION: [joinedload(QuestionTechnology.question)]
+    }
+
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session=session)
@@ -0,0 +1,59 @@
+import functools
+
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class UnitOfWork:
+    """
+    Откладывает commit всех записей репозиториев сессии до выхода из контекста:
+    внутри create/update/delete только добавляют изменения в сессию, а на выходе
+    выполняется один flush и один commit. Побочные эффекты (кэш и т.п.),
+    зарегистрированные через on_commit, запускаются только после успешного
+    commit; при исключении транзакция откатывается, а они отбрасываются.
+
+    Вложенные контексты той же сессии переиспользуют внешний unit of work.
+    Пока контекст открыт, у новых записей нет id (flush ещё не выполнялся):
+    если id нужен сразу, вызовите await uow.flush().
+    """
+
+    KEY = "unit_of_work"
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        self._callbacks: list[Callable[[], Awaitable[Any]]] = []
+        self._depth = 0
+
+    @classmethod
+    def get(cls, session: AsyncSession) -> "UnitOfWork | None":
+        return session.info.get(cls.KEY)
+
+    @classmethod
+    def begin(cls, session: AsyncSession) -> "UnitOfWork":
+        return cls.get(session) or cls(session)
+
+    def on_commit(self, callback: Callable[..., Awaitable[Any]], *args) -> None:
+        self._callbacks.append(functools.partial(callback, *args))
+
+    async def flush(self) -> None:
+        await self.session.flush()
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self._depth += 1
+        self.session.info[self.KEY] = self
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._depth -= 1
+        if self._depth:
+            return
+        del self.session.info[self.KEY]
+        callbacks, self._callbacks = self._callbacks, []
+        if exc_type is not None:
+            await self.session.rollback()
+            return
+        await self.session.commit()
+        for callback in callbacks:
+            await callback()
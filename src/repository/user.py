@@ -1,4 +1,9 @@
+from collections.abc import Mapping
+
+from sqlalchemy import BigInteger, column, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 
 from model.user import User
 from repository.base import BaseRepository
@@ -6,6 +11,81 @@ from repository.base import BaseRepository
 
 class UserRepository(BaseRepository):
     model = User
+    cache_ttl = 60 * 10
+    cache_keys = ("id", "tg_id")
+    # хэш пароля не должен быть виден всем, кто читает Redis
+    cache_exclude = ("password",)
 
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(session=session)
+
+    async def change_coins(
+        self, user_id: int, delta: int, commit: bool = True
+    ) -> int | None:
+        """
+        Атомарно меняет баланс одним UPDATE ... RETURNING: без чтения баланса в
+        Python и без потерянных обновлений при конкурентных запросах.
+
+        Args:
+            user_id: id пользователя.
+            delta: Изменение баланса; при списании (delta < 0) баланс не уходит
+            в минус - условие coins >= -delta проверяется в том же UPDATE.
+            commit: Если True, сохраняет изменения в базе данных сразу.
+
+        Returns:
+            int | None: Новый баланс или None, если пользователь не найден
+            или монет недостаточно.
+        """
+        statement = (
+            update(User)
+            .where(User.id == user_id)
+            .values(coins=User.coins + delta)
+            .returning(User.coins)
+        )
+        if delta < 0:
+            statement = statement.where(User.coins >= -delta)
+        coins = await self.session.scalar(statement)
+        await self._save(commit)
+        if coins is not None:
+            await self._cache_invalidate(user_id)
+        return coins
+
+    async def change_coins_many(
+        self, deltas: Mapping[int, int], commit: bool = True
+    ) -> dict[int, int]:
+        """
+        Атомарно меняет балансы нескольких пользователей одним
+        UPDATE ... FROM (VALUES ...) RETURNING.
+
+        Args:
+            deltas: Словарь {id пользователя: изменение баланса}. Списание
+            выполняется только у тех, у кого хватает монет.
+            commit: Если True, сохраняет изменения в базе данных сразу.
+
+        Returns:
+            dict[int, int]: Новые балансы изменённых пользователей; пропущенные
+            (не найдены или не хватило монет) в словарь не попадают.
+        """
+        if not deltas:
+            return {}
+        changes = values(
+            column("id", BigInteger), column("delta", BigInteger), name="changes"
+        ).data(list(deltas.items()))
+        statement = (
+            update(User)
+            .where(User.id == changes.c.id, User.coins + changes.c.delta >= 0)
+            .values(coins=User.coins + changes.c.delta)
+            .returning(User.id, User.coins)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(statement)
+        balances = dict(result.tuples().all())
+        # synchronize_session=False не трогает загруженные в сессию объекты:
+        # проставляем им новый баланс без повторного чтения и без пометки dirty
+        for user_id, coins in balances.items():
+            user = self.session.identity_map.get(identity_key(User, user_id))
+            if user is not None:
+                set_committed_value(user, "coins", coins)
+        await self._save(commit)
+        await self._cache_invalidate(*balances)
+        return balances
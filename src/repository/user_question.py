@@ -1,11 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from model.user_question import UserQuestion
-from repository.base import BaseRepository
+from repository.base import BaseRepository, LoadProfile
 
 
 class UserQuestionRepository(BaseRepository):
     model = UserQuestion
+    load_profiles = {LoadProfile.WITH_QUESTION: [joinedload(UserQuestion.question)]}
 
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(session=session)
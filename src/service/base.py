@@ -1,11 +1,12 @@
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
 from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import InstrumentedAttribute
 
 from model.base import Base, ModelObject
-from repository.base import BaseRepository
+from repository.base import BaseRepository, CursorPage
+from repository.unit_of_work import UnitOfWork
 
 
 class BaseService:
@@ -13,9 +14,40 @@ class BaseService:
         self.session = session
         self.repository = repository(session=session)
 
+    def unit_of_work(self) -> UnitOfWork:
+        """
+        Контекст, в котором записи всех сервисов этой сессии коммитятся
+        один раз в конце:
+
+            async with service.unit_of_work():
+                await service.create(...)
+                await other_service.update(...)
+        """
+        return UnitOfWork.begin(self.session)
+
+    async def after_commit(self, callback: Callable[..., Awaitable], *args) -> None:
+        """Выполняет callback сразу или после commit текущего unit of work."""
+        if (uow := UnitOfWork.get(self.session)) is not None:
+            uow.on_commit(callback, *args)
+            return
+        await callback(*args)
+
     async def create(self, **model_data) -> ModelObject:
         return await self.repository.create(**model_data)
 
+    async def create_many(self, items: Sequence[dict[str, Any]]) -> list[int]:
+        return await self.repository.create_many(items)
+
+    async def upsert_many(
+        self,
+        items: Sequence[dict[str, Any]],
+        conflict_fields: list[str] | None = None,
+        update_fields: list[str] | None = None,
+    ) -> list[int]:
+        return await self.repository.upsert_many(
+            items, conflict_fields=conflict_fields, update_fields=update_fields
+        )
+
     async def get(self, **filters) -> ModelObject | None:
         return await self.repository.get(**filters)
 
@@ -46,6 +78,55 @@ class BaseService:
             offset=offset,
         )
 
+    async def project(
+        self,
+        fields: Sequence[InstrumentedAttribute] | type,
+        filters: dict[str, Any],
+        exclude_data: dict[InstrumentedAttribute, Any] | None = None,
+        order_by: list[InstrumentedAttribute] | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+    ) -> list:
+        return await self.repository.project(
+            fields,
+            excludes=exclude_data,
+            order_by=order_by,
+            limit=limit,
+            offset=offset,
+            **filters,
+        )
+
+    async def stream(
+        self,
+        filters: dict[str, Any],
+        exclude_data: dict[InstrumentedAttribute, Any] | None = None,
+        order_by: list[InstrumentedAttribute] | None = None,
+        chunk_size: int | None = None,
+    ) -> AsyncIterator[ModelObject]:
+        async for instance in self.repository.stream(
+            chunk_size=chunk_size,
+            excludes=exclude_data,
+            order_by=order_by,
+            **filters,
+        ):
+            yield instance
+
+    async def paginate(
+        self,
+        filters: dict[str, Any],
+        limit: int,
+        cursor: str | None = None,
+        exclude_data: dict[InstrumentedAttribute, Any] | None = None,
+        order_by: list[InstrumentedAttribute] | None = None,
+    ) -> CursorPage:
+        return await self.repository.paginate(
+            limit=limit,
+            cursor=cursor,
+            excludes=exclude_data,
+            order_by=order_by,
+            **filters,
+        )
+
     async def get_or_create(
         self, filters: dict[str, Any], **model_data
     ) -> tuple[ModelObject, bool]:
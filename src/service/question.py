@@ -0,0 +1,246 @@
+import asyncio
+import json
+import random
+import time
+
+from array import array
+from collections import defaultdict
+from collections.abc import Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.cache import Cache, cache
+from core.config import config
+from core.database import db_conn
+from model.question import Question
+from model.user_question import UserQuestion
+from repository.question import QuestionRepository
+from repository.user_question import UserQuestionRepository
+from service.base import BaseService
+
+
+class QuestionCatalog:
+    """
+    Снимок опубликованных вопросов в памяти процесса: для каждой пары
+    (технология, сложность), а также для каждой технологии, каждой сложности
+    и всех вопросов вместе хранится компактный массив id. Снимок перечитывается
+    раз в ttl секунд и поправляется на месте при изменении вопросов. Строки
+    каталога общие для всех воркеров и берутся из Redis через get_or_compute,
+    так что по истечении срока в базу уходит один запрос, а не по одному
+    на воркер. Когда ключ в Redis меняется или удаляется, остальные воркеры
+    узнают об этом по каналу инвалидации и перечитывают снимок.
+    """
+
+    KEY = "question:catalog"
+
+    def __init__(
+        self,
+        cache: Cache,
+        session_factory: async_sessionmaker[AsyncSession],
+        ttl: int = config.question.catalog_ttl,
+    ) -> None:
+        self.cache = cache
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.loaded_at: float | None = None
+        self._index: dict[tuple[int | None, int | None], array] = {}
+        self._lock = asyncio.Lock()
+        self.cache.watch(self.KEY, self.expire)
+
+    @staticmethod
+    def _add(
+        index: dict[tuple[int | None, int | None], array],
+        question_id: int,
+        complexity: int,
+        technology_ids: Iterable[int],
+    ) -> None:
+        keys = {(None, complexity), (None, None)}
+        for technology_id in technology_ids:
+            keys |= {(technology_id, complexity), (technology_id, None)}
+        for key in keys:
+            index.setdefault(key, array("q")).append(question_id)
+
+    def is_fresh(self) -> bool:
+        return self.loaded_at is not None and (
+            time.monotonic() - self.loaded_at < self.ttl
+        )
+
+    async def _compute(self) -> str:
+        # пересчёт может идти в фоне, поэтому у него своя сессия
+        async with self.session_factory() as session:
+            rows = await QuestionRepository(session=session).get_published_catalog()
+        return json.dumps(rows)
+
+    async def load(self) -> None:
+        rows = json.loads(
+            await self.cache.get_or_compute(self.KEY, self._compute, expire=self.ttl)
+        )
+        complexities: dict[int, int] = {}
+        technologies: dict[int, list[int]] = defaultdict(list)
+        for question_id, complexity, technology_id in rows:
+            complexities[question_id] = complexity
+            if technology_id is not None:
+                technologies[question_id].append(technology_id)
+        index: dict[tuple[int | None, int | None], array] = {}
+        for question_id, complexity in complexities.items():
+            self._add(index, question_id, complexity, technologies[question_id])
+        self._index = index
+        self.loaded_at = time.monotonic()
+
+    async def ensure_loaded(self) -> None:
+        if self.is_fresh():
+            return
+        async with self._lock:
+            if not self.is_fresh():
+                await self.load()
+
+    def expire(self) -> None:
+        """Снимок будет перечитан из Redis при следующем обращении."""
+        self.loaded_at = None
+
+    async def invalidate(self) -> None:
+        """Снимок будет перечитан из базы при следующем обращении."""
+        self.expire()
+        await self.cache.delete(self.KEY)
+
+    async def remove(self, question_id: int) -> None:
+        """
+        Убирает вопрос из снимка сразу, а строки каталога в Redis удаляет, чтобы
+        ни этот, ни другие воркеры не вернули его из старого значения.
+        """
+        self.discard(question_id)
+        await self.cache.delete(self.KEY)
+
+    def discard(self, question_id: int) -> None:
+        for question_ids in self._index.values():
+            if question_id in question_ids:
+                question_ids.remove(question_id)
+
+    def candidates(
+        self, technology_id: int | None = None, complexity: int | None = None
+    ) -> array:
+        return self._index.get((technology_id, complexity), array("q"))
+
+
+class SeenQuestions:
+    """
+    Просмотренные пользователем вопросы - битовая карта в Redis, где бит с номером
+    question_id выставлен для каждого выданного вопроса. Бит 0 (id 0 не бывает)
+    отмечает, что карта заполнена из user_question; карта без него достраивается
+    из базы одним запросом и одним pipeline.
+    """
+
+    INITIALIZED_BIT = 0
+
+    def __init__(self, cache: Cache, ttl: int = config.question.seen_ttl) -> None:
+        self.cache = cache
+        self.ttl = ttl
+
+    @staticmethod
+    def key(user_id: int) -> str:
+        return f"user:{user_id}:seen_questions"
+
+    @staticmethod
+    def is_seen(bitmap: bytes, question_id: int) -> bool:
+        # Redis нумерует биты от старшего к младшему внутри каждого байта
+        byte = question_id >> 3
+        return byte < len(bitmap) and bool(bitmap[byte] & (0x80 >> (question_id & 7)))
+
+    async def get(self, session: AsyncSession, user_id: int) -> bytes:
+        bitmap = await self.cache.get(self.key(user_id), decode=None)
+        if bitmap and self.is_seen(bitmap, self.INITIALIZED_BIT):
+            return bitmap
+        rows = await UserQuestionRepository(session=session).project(
+            [UserQuestion.question_id], user_id=user_id, order_by=[]
+        )
+        question_ids = [self.INITIALIZED_BIT, *(row.question_id for row in rows)]
+        # SETBIT, а не SET: не затираем биты, выставленные параллельно
+        await self.cache.setbits(self.key(user_id), question_ids, self.ttl)
+        bitmap = bytearray(bitmap or b"")
+        for question_id in question_ids:
+            byte = question_id >> 3
+            if byte >= len(bitmap):
+                bitmap.extend(bytes(byte - len(bitmap) + 1))
+            bitmap[byte] |= 0x80 >> (question_id & 7)
+        return bytes(bitmap)
+
+    async def mark(self, user_id: int, question_id: int) -> None:
+        await self.cache.setbit(self.key(user_id), question_id, 1, self.ttl)
+
+    async def mark_many(self, user_id: int, question_ids: Iterable[int]) -> None:
+        await self.cache.setbits(self.key(user_id), question_ids, self.ttl)
+
+
+question_catalog = QuestionCatalog(cache, db_conn.session_factory)
+seen_questions = SeenQuestions(cache)
+
+
+class QuestionService(BaseService):
+    # сколько случайных кандидатов проверить, прежде чем фильтровать весь список
+    RANDOM_PROBES = 8
+
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session, QuestionRepository)
+
+    @classmethod
+    def pick_unseen(cls, candidates: array, bitmap: bytes) -> int | None:
+        if not candidates:
+            return None
+        for _ in range(min(len(candidates), cls.RANDOM_PROBES)):
+            question_id = random.choice(candidates)
+            if not SeenQuestions.is_seen(bitmap, question_id):
+                return question_id
+        unseen = [
+            question_id
+            for question_id in candidates
+            if not SeenQuestions.is_seen(bitmap, question_id)
+        ]
+        return random.choice(unseen) if unseen else None
+
+    async def get_next_question_id(
+        self,
+        user_id: int,
+        technology_id: int | None = None,
+        complexity: int | None = None,
+    ) -> int | None:
+        """
+        Случайный опубликованный вопрос, который пользователь ещё не видел, без
+        запроса к Postgres: кандидаты берутся из снимка каталога, просмотренные -
+        из битовой карты в Redis. None, если непросмотренных вопросов не осталось.
+        """
+        await question_catalog.ensure_loaded()
+        candidates = question_catalog.candidates(technology_id, complexity)
+        if not candidates:
+            return None
+        bitmap = await seen_questions.get(self.session, user_id)
+        return self.pick_unseen(candidates, bitmap)
+
+    async def get_next_question(
+        self,
+        user_id: int,
+        technology_id: int | None = None,
+        complexity: int | None = None,
+    ) -> Question | None:
+        question_id = await self.get_next_question_id(
+            user_id, technology_id, complexity
+        )
+        if question_id is None:
+            return None
+        return await self.repository.load(question_id)
+
+    async def update(self, instance: Question, **model_data) -> Question:
+        question = await self.repository.update(instance, **model_data)
+        await self.after_commit(self._sync_catalog, question.id, question.published)
+        return question
+
+    async def delete(self, instance: Question) -> None:
+        await self.repository.delete(instance)
+        await self.after_commit(self._sync_catalog, instance.id, False)
+
+    @staticmethod
+    async def _sync_catalog(question_id: int, published: bool) -> None:
+        if published:
+            # технологии вопроса хранятся отдельно - снимок перечитается целиком
+            await question_catalog.invalidate()
+        else:
+            await question_catalog.remove(question_id)
@@ -0,0 +1,31 @@
+from collections import defaultdict
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from model.user_question import UserQuestion
+from repository.user_question import UserQuestionRepository
+from service.base import BaseService
+from service.question import seen_questions
+
+
+class UserQuestionService(BaseService):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session, UserQuestionRepository)
+
+    async def create(self, **model_data) -> UserQuestion:
+        user_question = await self.repository.create(**model_data)
+        await self.after_commit(
+            seen_questions.mark, user_question.user_id, user_question.question_id
+        )
+        return user_question
+
+    async def create_many(self, items: Sequence[dict[str, Any]]) -> list[int]:
+        ids = await self.repository.create_many(items)
+        seen: dict[int, list[int]] = defaultdict(list)
+        for item in items:
+            seen[item["user_id"]].append(item["question_id"])
+        for user_id, question_ids in seen.items():
+            await self.after_commit(seen_questions.mark_many, user_id, question_ids)
+        return ids
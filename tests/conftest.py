@@ -0,0 +1,35 @@
+from collections.abc import AsyncIterator
+
+import pytest
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from benchmark.seed import BENCH_DB_NAME, get_engine
+from model.user import User
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--update-plans",
+        action="store_true",
+        help="сохранить оценки стоимости планов запросов как базовые",
+    )
+
+
+@pytest.fixture
+async def bench_engine() -> AsyncIterator[AsyncEngine]:
+    """Движок заполненной базы бенчмарков; без неё тест пропускается."""
+    engine = get_engine()
+    try:
+        async with engine.connect() as connection:
+            seeded = await connection.scalar(select(User.id).limit(1))
+    except (OSError, SQLAlchemyError) as e:
+        await engine.dispose()
+        pytest.skip(f"база {BENCH_DB_NAME} недоступна: {e!r}")
+    if seeded is None:
+        await engine.dispose()
+        pytest.skip(f"база {BENCH_DB_NAME} пуста, запустите python -m benchmark.seed")
+    yield engine
+    await engine.dispose()
@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+
+from core.cache import Cache
+
+
+@pytest.fixture
+def server() -> fakeredis.FakeServer:
+    return fakeredis.FakeServer()
+
+
+def make_cache(server: fakeredis.FakeServer, **kwargs) -> Cache:
+    cache = Cache(**kwargs)
+    cache.redis_cache = fakeredis.aioredis.FakeRedis(server=server)
+    return cache
+
+
+async def wait_for(condition, timeout: float = 1) -> None:
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+async def test_watch_fires_in_other_worker_without_local_cache(server):
+    writer = make_cache(server, local_size=0)
+    reader = make_cache(server, local_size=0)
+    fired = []
+    for cache in (writer, reader):
+        cache.watch("question:catalog", lambda: fired.append(True))
+    await reader.start_invalidation()
+    try:
+        await wait_for(lambda: reader._subscribed)
+        await writer.delete("question:catalog")
+        await wait_for(lambda: fired)
+    finally:
+        await reader.stop_invalidation()
+
+    assert fired == [True]
+
+
+async def test_failed_set_drops_stale_value_after_recovery(server):
+    cache = make_cache(server, local_size=0)
+    await cache.set("user:1", "old")
+    cache.breaker.state = cache.breaker.OPEN
+    cache.breaker.opened_at = time.monotonic()
+
+    await cache.set_many({"user:1": "new", "user:2": "new"})
+    cache.breaker.record_success()
+
+    assert await cache.get_many(["user:1", "user:2"]) == {
+        "user:1": None,
+        "user:2": None,
+    }
+    assert await cache.get("user:1") is None
+    await cache.get("other")
+    await wait_for(lambda: cache._flush_task is None)
+    assert await cache.redis_cache.get("user:1") is None
+    assert cache._pending_deletes == set()
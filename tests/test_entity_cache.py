@@ -0,0 +1,77 @@
+import asyncio
+
+from datetime import datetime
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import cache
+from model.user import User
+from repository.cache import entity_cache
+from repository.user import UserRepository
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch) -> fakeredis.aioredis.FakeRedis:
+    redis = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer())
+    monkeypatch.setattr(cache, "redis_cache", redis)
+    return redis
+
+
+def make_user(pk: int = 5) -> User:
+    return User(
+        id=pk,
+        tg_id=pk + 772,
+        tg_url="https://t.me/user",
+        first_name="Ivan",
+        coins=3,
+        is_active=True,
+        is_admin=False,
+        password="$2b$12$hash",
+        created_at=datetime(2024, 1, 1),
+        updated_at=datetime(2024, 1, 2),
+    )
+
+
+async def test_password_is_not_cached(redis):
+    await entity_cache.set(UserRepository(AsyncSession()), make_user())
+
+    data = await redis.get(entity_cache.key(User, "id", 5))
+    assert b"$2b$12$hash" not in data
+    assert b"password" not in data
+
+
+async def test_cached_user_leaves_password_unloaded():
+    await entity_cache.set(UserRepository(AsyncSession()), make_user())
+
+    user = await UserRepository(AsyncSession()).find(tg_id=777)
+
+    assert (user.id, user.coins) == (5, 3)
+    assert "password" in inspect(user).unloaded
+
+
+async def test_concurrent_loads_send_one_query_for_cache_misses(monkeypatch):
+    queries = []
+
+    async def filter(self, id, order_by):
+        queries.append(id["in"])
+        return [make_user(pk) for pk in id["in"] if pk != 404]
+
+    monkeypatch.setattr(UserRepository, "filter", filter)
+    for pk in (1, 2):
+        await entity_cache.set(UserRepository(AsyncSession()), make_user(pk))
+    repository = UserRepository(AsyncSession())
+
+    users = await asyncio.gather(*[repository.load(pk) for pk in (1, 2, 3, 4, 404, 3)])
+
+    assert queries == [[3, 4, 404]]
+    assert [user and user.id for user in users] == [1, 2, 3, 4, None, 3]
+    assert users[2] is users[5]
+    # прочитанные из базы записи попали в кэш, и load_many берёт их оттуда
+    reloaded = await UserRepository(AsyncSession()).load_many([3, 4])
+    assert [user.id for user in reloaded] == [3, 4]
+    assert queries == [[3, 4, 404]]
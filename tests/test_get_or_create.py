@@ -0,0 +1,49 @@
+"""
+Конкурентная проверка get_or_create/update_or_create на заполненной базе
+бенчмарков: CALLERS параллельных вызовов с одним ключом question_technology
+(question_id, technology_id) должны дать ровно одну строку, ровно один
+created=True и ни одной ошибки.
+
+    python -m benchmark.seed
+    pytest tests/test_get_or_create.py
+"""
+
+import asyncio
+
+import pytest
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from benchmark.seed import get_session_factory
+from model.question_technology import QuestionTechnology
+from repository.question_technology import QuestionTechnologyRepository
+
+
+CALLERS = 100
+KEY = {"question_id": 1, "technology_id": 1}
+
+
+@pytest.mark.parametrize("method", ["get_or_create", "update_or_create"])
+async def test_concurrent_callers_create_one_row(
+    method: str, bench_engine: AsyncEngine
+):
+    session_factory = get_session_factory(bench_engine)
+
+    async def call():
+        async with session_factory() as session:
+            repository = QuestionTechnologyRepository(session=session)
+            if method == "get_or_create":
+                return await repository.get_or_create(list(KEY), **KEY)
+            return await repository.update_or_create(KEY, technology_id=1)
+
+    async with session_factory() as session:
+        await session.execute(delete(QuestionTechnology).filter_by(**KEY))
+        await session.commit()
+    results = await asyncio.gather(*[call() for _ in range(CALLERS)])
+    async with session_factory() as session:
+        rows = await QuestionTechnologyRepository(session=session).count(**KEY)
+
+    assert sum(created for _, created in results) == 1
+    assert rows == 1
+    assert len({instance.id for instance, _ in results}) == 1
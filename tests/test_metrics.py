@@ -0,0 +1,49 @@
+import pytest
+
+from core.metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_counter_renders_labels():
+    registry = Registry()
+    counter = registry.register(Counter("errors_total", "Ошибки", ("statement",)))
+    counter.inc('SELECT "a"')
+    counter.inc('SELECT "a"', amount=2)
+
+    assert registry.render() == (
+        "# HELP errors_total Ошибки\n"
+        "# TYPE errors_total counter\n"
+        'errors_total{statement="SELECT \\"a\\""} 3\n'
+    )
+
+
+def test_gauge_reads_callback_on_render():
+    values = {("primary",): 1}
+    gauge = Gauge("checked_out", "Соединения", lambda: values, ("engine",))
+    values[("replica0",)] = 2.5
+
+    assert list(gauge.samples()) == [
+        'checked_out{engine="primary"} 1',
+        'checked_out{engine="replica0"} 2.5',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("duration_seconds", "Время", (0.1, 1))
+    for value in (0.05, 0.5, 0.5, 5):
+        histogram.observe(value)
+
+    assert list(histogram.samples()) == [
+        'duration_seconds_bucket{le="0.1"} 1',
+        'duration_seconds_bucket{le="1"} 3',
+        'duration_seconds_bucket{le="+Inf"} 4',
+        "duration_seconds_sum 6.05",
+        "duration_seconds_count 4",
+    ]
+
+
+def test_registry_rejects_duplicate_names():
+    registry = Registry()
+    registry.register(Counter("requests_total", "Запросы"))
+
+    with pytest.raises(ValueError):
+        registry.register(Counter("requests_total", "Запросы"))
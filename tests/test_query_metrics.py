@@ -0,0 +1,76 @@
+import pytest
+
+from core.database import QueryMetrics
+from core.metrics import Registry
+
+
+@pytest.fixture
+def query_metrics() -> QueryMetrics:
+    return QueryMetrics(Registry(), max_statements=2, n_plus_one_threshold=3)
+
+
+@pytest.mark.parametrize(
+    "statement, expected",
+    [
+        (
+            "SELECT user.id FROM user WHERE user.tg_id = $1::BIGINT",
+            "SELECT user.id FROM user WHERE user.tg_id = ?",
+        ),
+        (
+            "SELECT answer.id FROM answer WHERE answer.id IN "
+            "($1::BIGINT, $2::BIGINT, $3::BIGINT)",
+            "SELECT answer.id FROM answer WHERE answer.id IN (?, ...)",
+        ),
+        (
+            "UPDATE user SET updated_at=$1::TIMESTAMP WITHOUT TIME ZONE "
+            "WHERE user.id = ANY ($2::INTEGER[])",
+            "UPDATE user SET updated_at=? WHERE user.id = ANY (?)",
+        ),
+        (
+            "SELECT relname, reltuples::bigint FROM pg_class "
+            "WHERE relkind = 'r' LIMIT 10",
+            "SELECT relname, reltuples::bigint FROM pg_class "
+            "WHERE relkind = ? LIMIT ?",
+        ),
+        (
+            "SELECT *\n  FROM question\n WHERE question.text = %(text_1)s",
+            "SELECT * FROM question WHERE question.text = ?",
+        ),
+    ],
+)
+def test_normalize(statement: str, expected: str):
+    assert QueryMetrics.normalize(statement) == expected
+
+
+def test_normalize_folds_lists_of_any_length():
+    labels = {
+        QueryMetrics.normalize(
+            "SELECT 1 FROM t WHERE id IN ("
+            + ", ".join(f"${n}::BIGINT" for n in range(1, size + 1))
+            + ")"
+        )
+        for size in range(2, 50)
+    }
+    assert labels == {"SELECT ? FROM t WHERE id IN (?, ...)"}
+
+
+def test_label_limits_distinct_statements(query_metrics: QueryMetrics):
+    assert query_metrics.label("SELECT a FROM t WHERE id = $1") == (
+        "SELECT a FROM t WHERE id = ?"
+    )
+    assert query_metrics.label("SELECT b FROM t") == "SELECT b FROM t"
+    assert query_metrics.label("SELECT c FROM t") == QueryMetrics.OTHER
+    assert query_metrics.label("SELECT a FROM t WHERE id = $2") == (
+        "SELECT a FROM t WHERE id = ?"
+    )
+
+
+def test_track_counts_repeated_statements(query_metrics: QueryMetrics):
+    with query_metrics.track("GET /users") as statements:
+        for _ in range(3):
+            statements["SELECT a FROM t WHERE id = ?"] += 1
+        statements["SELECT b FROM t"] += 1
+
+    assert list(query_metrics.n_plus_one.samples()) == [
+        'db_n_plus_one_total{statement="SELECT a FROM t WHERE id = ?"} 1'
+    ]
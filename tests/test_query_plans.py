@@ -0,0 +1,282 @@
+"""
+Проверка планов запросов репозиториев на заполненной базе бенчмарков.
+
+Каждый сценарий вызывает методы репозиториев так же, как это делают сервисы,
+внутри транзакции, которая затем откатывается. Отправленные в Postgres запросы
+перехватываются событием before_cursor_execute и ещё раз выполняются через
+EXPLAIN (FORMAT JSON) с теми же параметрами. Тест не проходит, если в плане есть
+Seq Scan по таблице не меньше MIN_ROWS строк, не разрешённый сценарию, или оценка
+стоимости выросла больше чем на TOLERANCE относительно сохранённой в plans.json.
+Для Seq Scan выводится условие фильтра - по нему видно, какого индекса не хватает.
+
+    python -m benchmark.seed --answers 1000000
+    pytest tests/test_query_plans.py --update-plans   # сохранить оценки
+    pytest tests/test_query_plans.py
+"""
+
+import json
+
+from collections.abc import Awaitable, Callable, Iterator
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import pytest
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from benchmark.seed import Sample, get_sample, get_session_factory, repository
+from model.answer import Answer
+from model.user_question import UserQuestion
+from repository.ai_assessment import AIAssessmentRepository
+from repository.answer import AnswerRepository
+from repository.base import FilterCondition
+from repository.question import QuestionRepository
+from repository.user import UserRepository
+from repository.user_question import UserQuestionRepository
+
+
+BASELINE_PATH = Path(__file__).with_name("plans.json")
+MIN_ROWS = 10_000
+TOLERANCE = 0.5
+
+
+class Case(NamedTuple):
+    name: str
+    run: Callable[[AsyncSession, Sample], Awaitable[Any]]
+    # таблицы, которые сценарий читает целиком намеренно
+    allow_seq_scan: frozenset[str] = frozenset()
+
+
+CASES = [
+    Case(
+        "user.get_by_id", lambda s, x: repository(UserRepository, s).get(id=x.user_id)
+    ),
+    Case(
+        "user.get_by_tg_id",
+        lambda s, x: repository(UserRepository, s).get(tg_id=x.tg_id),
+    ),
+    Case(
+        "user.change_coins",
+        lambda s, x: repository(UserRepository, s).change_coins(
+            x.user_id, -1, commit=False
+        ),
+    ),
+    Case(
+        "user.change_coins_many",
+        lambda s, x: repository(UserRepository, s).change_coins_many(
+            {x.user_id: 1, x.user_id + 1: -1}, commit=False
+        ),
+    ),
+    Case(
+        "question.load",
+        lambda s, x: repository(QuestionRepository, s).load(x.question_id),
+    ),
+    Case(
+        "question.published_catalog",
+        lambda s, x: repository(QuestionRepository, s).get_published_catalog(),
+        frozenset({"question", "question_technology"}),
+    ),
+    Case(
+        "user_question.seen_questions",
+        lambda s, x: repository(UserQuestionRepository, s).project(
+            [UserQuestion.question_id], user_id=x.user_id, order_by=[]
+        ),
+    ),
+    Case(
+        "user_question.exists",
+        lambda s, x: repository(UserQuestionRepository, s).exists(
+            user_id=x.user_id, question_id=x.question_id
+        ),
+    ),
+    Case(
+        "user_question.create",
+        lambda s, x: repository(UserQuestionRepository, s).create(
+            commit=False, user_id=x.user_id, question_id=x.question_id
+        ),
+    ),
+    Case(
+        "answer.by_user",
+        lambda s, x: repository(AnswerRepository, s).filter(
+            user_id=x.user_id, order_by=[Answer.created_at.desc()], limit=50
+        ),
+    ),
+    Case(
+        "answer.by_question",
+        lambda s, x: repository(AnswerRepository, s).filter(
+            question_id=x.question_id, limit=50
+        ),
+    ),
+    Case(
+        "answer.count_by_user",
+        lambda s, x: repository(AnswerRepository, s).count(user_id=x.user_id),
+    ),
+    Case(
+        "answer.paginate",
+        lambda s, x: repository(AnswerRepository, s).paginate(limit=50),
+    ),
+    Case(
+        "answer.search",
+        lambda s, x: repository(AnswerRepository, s).search("text", "транзакция"),
+    ),
+    Case(
+        "answer.similar",
+        lambda s, x: repository(AnswerRepository, s).search(
+            "text", "транзакцыя", FilterCondition.SIMILAR
+        ),
+    ),
+    Case(
+        "ai_assessment.by_answer",
+        lambda s, x: repository(AIAssessmentRepository, s).find(answer_id=x.answer_id),
+    ),
+    Case(
+        "ai_assessment.by_user",
+        lambda s, x: repository(AIAssessmentRepository, s).filter(
+            user_id=x.user_id, limit=50
+        ),
+    ),
+]
+
+
+class StatementRecorder:
+    """Запоминает SQL и параметры всех запросов, пока включён."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.statements: list[tuple[str, Any]] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.enabled and not executemany:
+            self.statements.append((statement, parameters))
+
+
+def iter_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from iter_nodes(child)
+
+
+async def explain(session: AsyncSession, statement: str, parameters: Any) -> dict:
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {statement}", parameters
+    )
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def check_plan(
+    name: str,
+    plan: dict,
+    case: Case,
+    table_rows: dict[str, float],
+    baseline: dict[str, float],
+    min_rows: int = MIN_ROWS,
+    tolerance: float = TOLERANCE,
+) -> list[str]:
+    problems = []
+    for node in iter_nodes(plan):
+        table = node.get("Relation Name")
+        if (
+            node["Node Type"] == "Seq Scan"
+            and table not in case.allow_seq_scan
+            and table_rows.get(table, 0) >= min_rows
+        ):
+            condition = node.get("Filter", "без условия")
+            problems.append(f"Seq Scan on {table} ({condition})")
+    cost = plan["Total Cost"]
+    if name in baseline and cost > baseline[name] * (1 + tolerance):
+        problems.append(f"cost {baseline[name]:.1f} -> {cost:.1f}")
+    return problems
+
+
+def plan(node_type: str, cost: float = 10.0, **node: Any) -> dict:
+    return {"Node Type": node_type, "Total Cost": cost, **node}
+
+
+def test_iter_nodes_walks_nested_plans():
+    root = plan(
+        "Nested Loop",
+        Plans=[plan("Index Scan", Plans=[plan("Seq Scan")]), plan("Hash")],
+    )
+    assert [node["Node Type"] for node in iter_nodes(root)] == [
+        "Nested Loop",
+        "Index Scan",
+        "Seq Scan",
+        "Hash",
+    ]
+
+
+def test_check_plan_reports_seq_scan_on_large_table():
+    root = plan(
+        "Limit",
+        Plans=[plan("Seq Scan", **{"Relation Name": "answer", "Filter": "(x = 1)"})],
+    )
+    case = Case("answer.by_x", None)
+
+    assert check_plan("answer.by_x#0", root, case, {"answer": 10**6}, {}) == [
+        "Seq Scan on answer ((x = 1))"
+    ]
+
+
+def test_check_plan_ignores_small_and_allowed_tables():
+    root = plan(
+        "Hash Join",
+        Plans=[
+            plan("Seq Scan", **{"Relation Name": "technology"}),
+            plan("Seq Scan", **{"Relation Name": "question"}),
+        ],
+    )
+    case = Case("catalog", None, frozenset({"question"}))
+    rows = {"technology": 20, "question": 10**6}
+
+    assert check_plan("catalog#0", root, case, rows, {}) == []
+
+
+def test_check_plan_reports_cost_regression():
+    case = Case("user.get", None)
+    baseline = {"user.get#0": 10.0}
+
+    assert check_plan("user.get#0", plan("Index Scan", 14.0), case, {}, baseline) == []
+    assert check_plan("user.get#0", plan("Index Scan", 16.0), case, {}, baseline) == [
+        "cost 10.0 -> 16.0"
+    ]
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case.name for case in CASES])
+async def test_query_plan(
+    case: Case, bench_engine: AsyncEngine, request: pytest.FixtureRequest
+):
+    update = request.config.getoption("--update-plans")
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    recorder = StatementRecorder()
+    event.listen(bench_engine.sync_engine, "before_cursor_execute", recorder)
+    problems = []
+    async with get_session_factory(bench_engine)() as session:
+        rows = await session.execute(
+            text("SELECT relname, reltuples FROM pg_class WHERE relkind = 'r'")
+        )
+        table_rows = dict(rows.tuples().all())
+        sample = await get_sample(session)
+        recorder.enabled = True
+        try:
+            await case.run(session, sample)
+        finally:
+            recorder.enabled = False
+        for index, (statement, parameters) in enumerate(recorder.statements):
+            name = f"{case.name}#{index}"
+            query_plan = await explain(session, statement, parameters)
+            problems.extend(
+                f"{name}: {problem}"
+                for problem in check_plan(
+                    name, query_plan, case, table_rows, {} if update else baseline
+                )
+            )
+            baseline[name] = query_plan["Total Cost"]
+        await session.rollback()
+
+    if update:
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+    assert not problems, "\n".join(problems)
@@ -0,0 +1,40 @@
+from unittest.mock import Mock
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from core.cache import cache
+from model.user import User
+from repository.user import UserRepository
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch) -> None:
+    redis = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer())
+    monkeypatch.setattr(cache, "redis_cache", redis)
+
+
+async def test_change_coins_many_updates_loaded_users(monkeypatch):
+    session = AsyncSession()
+    user = User(id=1, tg_id=1, tg_url="https://t.me/user", first_name="Ivan", coins=5)
+    make_transient_to_detached(user)
+    session.add(user)
+    result = Mock()
+    result.tuples.return_value.all.return_value = [(1, 3), (2, 10)]
+
+    async def execute(statement):
+        return result
+
+    monkeypatch.setattr(session, "execute", execute)
+
+    balances = await UserRepository(session).change_coins_many(
+        {1: -2, 2: 1}, commit=False
+    )
+
+    assert balances == {1: 3, 2: 10}
+    assert user.coins == 3
+    assert not session.is_modified(user)
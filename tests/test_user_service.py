@@ -0,0 +1,32 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from service.user import UserService
+
+
+@pytest.fixture
+def service() -> UserService:
+    service = UserService(session=Mock())
+    service.repository = AsyncMock()
+    return service
+
+
+@pytest.mark.parametrize("amount", [0, -1])
+async def test_debit_and_credit_reject_non_positive_amount(
+    service: UserService, amount: int
+):
+    with pytest.raises(ValueError):
+        await service.debit(1, amount)
+    with pytest.raises(ValueError):
+        await service.credit(1, amount)
+    with pytest.raises(ValueError):
+        await service.debit_many({1: 1, 2: amount})
+    service.repository.change_coins.assert_not_awaited()
+    service.repository.change_coins_many.assert_not_awaited()
+
+
+async def test_debit_many_negates_amounts(service: UserService):
+    await service.debit_many({1: 2, 2: 3})
+
+    service.repository.change_coins_many.assert_awaited_once_with({1: -2, 2: -3})